@@ -1,10 +1,24 @@
 from sqlalchemy import text
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from app.routers.users import router as users_router
 from app.routers.auth import router as auth_router
 from app.routers.products import router as products_router
 from app.core.config import settings
-from app.dependencies import SessionDependency
+from app.dependencies import SessionDependency, CurrentAdminPrincipalDependency
+from app.handlers.response import (
+    idempotency_cache,
+    idempotent_flights,
+    request_flights,
+)
+from app.services.auth.jwt import verified_token_cache
+from app.services.auth.keys import access_key_ring
+from app.services.auth.password import password_hash_pool
+from app.services.auth.user_cache import user_cache, token_version_cache
+from app.services.product_cache import product_cache
+from app.services.reaper import reaper
+from app.services.suggest import suggest_cache
+from app.utils.pagination import count_cache, parallel_count_budget
 
 
 router = APIRouter(prefix=settings.API_V1_PREFIX)
@@ -29,3 +43,32 @@ async def health_check(session: SessionDependency):
         "version": settings.VERSION,
         "services": {"database": db_status},
     }
+
+
+@router.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks():
+    # public keys for verifying access tokens, served in the standard JWKS format.
+    return JSONResponse(
+        content=access_key_ring.jwks(),
+        headers={
+            "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}"
+        },
+    )
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(current_admin_user: CurrentAdminPrincipalDependency):
+    return {
+        "verified_token_cache": verified_token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "token_version_cache": token_version_cache.stats(),
+        "password_hash_pool": password_hash_pool.stats(),
+        "reaper": reaper.stats(),
+        "pagination_count_cache": count_cache.stats(),
+        "pagination_parallel_count": parallel_count_budget.stats(),
+        "suggest_cache": suggest_cache.stats(),
+        "product_cache": product_cache.stats(),
+        "request_flights": request_flights.stats(),
+        "idempotency_cache": idempotency_cache.stats(),
+        "idempotent_flights": idempotent_flights.stats(),
+    }
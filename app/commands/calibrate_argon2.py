@@ -0,0 +1,87 @@
+# app/commands/calibrate_argon2.py
+"""
+Benchmark argon2 on the current host and suggest parameters for a latency budget.
+
+Usage:
+    python -m app.commands.calibrate_argon2 --target-ms 250 --samples 10
+"""
+
+import argparse
+import os
+import time
+
+from argon2 import PasswordHasher
+
+MEMORY_COSTS_MIB = [19, 32, 46, 64, 100, 128, 192, 256, 512]
+MAX_TIME_COST = 10
+
+
+def measure(
+    time_cost: int, memory_cost_kib: int, parallelism: int, samples: int
+) -> float:
+    """Return the worst observed hash latency in milliseconds (p99 for small samples)."""
+    hasher = PasswordHasher(
+        time_cost=time_cost, memory_cost=memory_cost_kib, parallelism=parallelism
+    )
+    latencies = []
+    for _ in range(samples):
+        start_time = time.perf_counter()
+        hasher.hash("calibration-password")
+        latencies.append((time.perf_counter() - start_time) * 1000)
+
+    latencies.sort()
+    return latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+
+def calibrate(
+    target_ms: float, samples: int, parallelism: int, max_memory_mib: int
+) -> dict | None:
+    best = None
+    for memory_mib in [m for m in MEMORY_COSTS_MIB if m <= max_memory_mib]:
+        memory_cost = memory_mib * 1024
+        for time_cost in range(1, MAX_TIME_COST + 1):
+            p99 = measure(time_cost, memory_cost, parallelism, samples)
+            print(
+                f"  time_cost={time_cost:<2} memory={memory_mib:>4} MiB "
+                f"parallelism={parallelism} p99={p99:8.1f} ms"
+            )
+            if p99 > target_ms:
+                break
+
+            # prefer the most expensive configuration that still fits the budget.
+            cost = time_cost * memory_cost
+            if best is None or cost > best["cost"]:
+                best = {
+                    "time_cost": time_cost,
+                    "memory_cost": memory_cost,
+                    "parallelism": parallelism,
+                    "p99_ms": p99,
+                    "cost": cost,
+                }
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--parallelism", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--max-memory-mib", type=int, default=256)
+    args = parser.parse_args()
+
+    print(f"Calibrating argon2 for a p99 of {args.target_ms} ms ...")
+    best = calibrate(
+        args.target_ms, args.samples, args.parallelism, args.max_memory_mib
+    )
+    if best is None:
+        print("No configuration fits the latency budget, raise --target-ms.")
+        raise SystemExit(1)
+
+    print(f"\nSuggested settings (p99 {best['p99_ms']:.1f} ms):")
+    print(f"ARGON2_TIME_COST = {best['time_cost']}")
+    print(f"ARGON2_MEMORY_COST = {best['memory_cost']}")
+    print(f"ARGON2_PARALLELISM = {best['parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# app/commands/reap.py
+"""
+Delete expired/revoked sessions and expired/used verification tokens once.
+
+Usage:
+    python -m app.commands.reap --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import json
+
+from app.core.config import settings
+from app.db.session import async_engine
+from app.services.reaper import ReaperService
+
+
+async def run(batch_size: int, batch_pause: float) -> None:
+    reaper = ReaperService(batch_size=batch_size, batch_pause=batch_pause)
+    try:
+        await reaper.run_once()
+    finally:
+        await async_engine.dispose()
+    print(json.dumps(reaper.stats(), default=str, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=settings.REAPER_BATCH_SIZE)
+    parser.add_argument(
+        "--batch-pause", type=float, default=settings.REAPER_BATCH_PAUSE_SECONDS
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.batch_size, args.batch_pause))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,24 @@
-from typing import Union
+from typing import Literal, Optional, Union
 import os
+from datetime import datetime
 from functools import lru_cache
+from pydantic import BaseModel, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class JwtKeyConfig(BaseModel):
+    """An asymmetric access-token signing key in the JWT key ring."""
+
+    kid: str
+    algorithm: str = "ES256"
+    # PEM files; keys without a private key are only used for verification.
+    private_key_file: Optional[str] = None
+    public_key_file: Optional[str] = None
+    # rotation window: signing starts at `not_before`, verification ends at `not_after`
+    not_before: Optional[datetime] = None
+    not_after: Optional[datetime] = None
+
+
 class AppSettings(BaseSettings):
     """Shared settings across all environments"""
 
@@ -34,19 +49,118 @@ class AppSettings(BaseSettings):
     JWT_ACCESS_EXPIRE_MINUTES: int
     JWT_REFRESH_EXPIRE_MINUTES: int
 
+    # Asymmetric access-token key ring (JSON list), replaces the HMAC access secret
+    JWT_ACCESS_KEYS: list[JwtKeyConfig] = []
+    JWKS_MAX_AGE_SECONDS: int = 300
+
+    # Embed role/email_verified claims in access tokens so routes can
+    # authorize from the token alone (claims may lag the DB until token expiry)
+    JWT_EMBED_USER_CLAIMS: bool = False
+
+    # Max verified access tokens kept in memory (0 disables the cache)
+    JWT_VERIFIED_TOKEN_CACHE_SIZE: int = 4096
+
     MAX_ACTIVE_SESSIONS: int = 5
 
+    # Authenticated user cache (0 size disables the cache)
+    USER_CACHE_SIZE: int = 4096
+    USER_CACHE_TTL_SECONDS: int = 60
+    # How long other instances may accept access tokens after a version bump
+    TOKEN_VERSION_CACHE_TTL_SECONDS: int = 30
+
+    # Argon2 parameters, see `python -m app.commands.calibrate_argon2`
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 102400  # KiB (100 MB)
+    ARGON2_PARALLELISM: int = 2
+
+    # Password hashing pool (0 concurrency = derive from free RAM and CPUs)
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 0
+    PASSWORD_HASH_MEMORY_FRACTION: float = 0.25
+    PASSWORD_HASH_MAX_WAITING: int = 32
+    PASSWORD_HASH_WAIT_TIMEOUT_SECONDS: float = 5.0
+
+    # Background reaper for expired sessions and verification tokens
+    REAPER_ENABLED: bool = True
+    REAPER_INTERVAL_SECONDS: int = 300
+    REAPER_BATCH_SIZE: int = 1000
+    REAPER_BATCH_PAUSE_SECONDS: float = 0.1
+
     # Verification Token Configs
     VERIFICATION_TOKEN_SECRET: str
     PASSWORD_RESET_EXPIRE_MINUTES: int = 15
     EMAIL_VERIFICATION_EXPIRE_MINUTES: int = 1440  # 24 hours
 
+    # Signs keyset pagination cursors (falls back to VERIFICATION_TOKEN_SECRET)
+    PAGINATION_CURSOR_SECRET: Optional[str] = None
+    # Listing totals reused by `count=cached` (0 size disables the cache)
+    PAGINATION_COUNT_CACHE_SIZE: int = 1024
+    PAGINATION_COUNT_CACHE_TTL_SECONDS: int = 30
+    # How listing counts run next to the data query: sequential, parallel
+    # (second pooled connection) or window (`count(*) OVER ()`, which reads
+    # every matching row before the limit applies)
+    PAGINATION_COUNT_STRATEGY: Literal["sequential", "parallel", "window"] = (
+        "sequential"
+    )
+    # Max connections parallel counts may hold at once
+    PAGINATION_PARALLEL_COUNT_CONNECTIONS: int = 5
+
+    # Max items accepted by product bulk endpoints
+    PRODUCT_BULK_MAX_ITEMS: int = 1000
+    # Max ids resolved by GET /products/batch
+    PRODUCT_BATCH_MAX_IDS: int = 100
+
+    # Product imports, COPY chunk size, reported errors and background jobs
+    PRODUCT_IMPORT_CHUNK_SIZE: int = 5000
+    PRODUCT_IMPORT_MAX_ERRORS: int = 100
+    # Characters a single CSV record or NDJSON line may span, longer ones are rejected
+    PRODUCT_IMPORT_MAX_RECORD_LENGTH: int = 65536
+    PRODUCT_IMPORT_MAX_JOBS: int = 1024
+    PRODUCT_IMPORT_JOB_TTL_SECONDS: int = 3600
+
+    # Rows fetched per server-side cursor batch by streamed exports
+    EXPORT_BATCH_SIZE: int = 1000
+    # Pooled connections kept by the export engine, one per running download
+    EXPORT_DB_POOL_SIZE: int = 2
+
+    # Product listing filters and facets
+    PRODUCT_LOW_STOCK_THRESHOLD: int = 5
+    PRODUCT_PRICE_FACET_BOUNDARIES: list[float] = [10, 50, 100, 500, 1000, 5000]
+
+    # Per-user in-memory product name indexes for /products/suggest
+    # (0 size disables them, catalogs above the max names use the database)
+    SUGGEST_CACHE_SIZE: int = 1024
+    SUGGEST_CACHE_TTL_SECONDS: int = 300
+    SUGGEST_INDEX_MAX_NAMES: int = 10000
+
+    # Per-user cache of product read responses, invalidated on every write
+    # (redis shares entries across instances, needs PRODUCT_CACHE_REDIS_URL and
+    # the optional `redis` package, which requirements.txt doesn't install)
+    PRODUCT_CACHE_BACKEND: Literal["none", "memory", "redis"] = "memory"
+    PRODUCT_CACHE_SIZE: int = 10000
+    PRODUCT_CACHE_TTL_SECONDS: int = 60
+    PRODUCT_CACHE_REDIS_URL: Optional[str] = None
+
+    # Max requests sharing one call of a route opted into coalescing
+    SINGLE_FLIGHT_MAX_WAITERS: int = 100
+
+    # Stored first responses of @idempotent routes sent with an Idempotency-Key
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_TTL_SECONDS: int = 3600
+
     FRONTEND_URL: str = "http://localhost:3000"
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True, extra="ignore"
     )
 
+    @model_validator(mode="after")
+    def check_product_cache_redis_url(self):
+        if self.PRODUCT_CACHE_BACKEND == "redis" and not self.PRODUCT_CACHE_REDIS_URL:
+            raise ValueError(
+                "PRODUCT_CACHE_REDIS_URL is required with PRODUCT_CACHE_BACKEND=redis"
+            )
+        return self
+
 
 class DevelopmentSettings(AppSettings):
     DEBUG: bool = True
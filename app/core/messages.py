@@ -5,14 +5,29 @@ class ErrorMessages:
     USER_ALREADY_EXISTS = "User already exists"
     USER_NOT_FOUND = "User not found"
     PRODUCT_NOT_FOUND = "Product not found"
+    PRODUCT_MODIFIED = "Product was modified, reload it and retry"
+    INVALID_PAGINATION_CURSOR = "Invalid pagination cursor"
+    UNSUPPORTED_IMPORT_FORMAT = "Import must be CSV or NDJSON"
+    INVALID_IMPORT_FILE = "Import file could not be read"
+    IMPORT_RECORD_TOO_LONG = "Import record is too long"
+    IMPORT_JOB_NOT_FOUND = "Import job not found"
+    RELEVANCE_REQUIRES_QUERY = "Sorting by relevance requires a search query"
+    INVALID_IDEMPOTENCY_KEY = "Idempotency-Key must be 1 to 255 characters"
+    IDEMPOTENCY_KEY_REUSED = "Idempotency-Key was already used for another request"
+    IDEMPOTENT_REQUEST_INTERRUPTED = (
+        "The first request with this Idempotency-Key was interrupted, "
+        "check whether it took effect before retrying"
+    )
     UNAUTHORIZED = "Authentication required"
 
     NOT_ENOUGH_PERMISSIONS = "Not enough permissions"
     INTERNAL_SERVER_ERROR = "Internal server error"
+    SERVICE_BUSY = "Service is busy, please retry shortly"
 
 
 class SuccessMessages:
     SESSION_REVOKED = "Session revoked successfully"
+    ALL_SESSIONS_REVOKED = "All sessions revoked successfully"
     SESSION_LOGGED_OUT = "Successfully logged out of the session!"
 
     USER_CREATED = "User created successfully"
@@ -10,6 +10,11 @@ from sqlalchemy.orm import declarative_base
 # create base model
 Base = declarative_base()
 
+CONNECT_ARGS = {
+    "server_settings": {"jit": "off"},
+    "statement_cache_size": 0,  # Disable statement caching
+}
+
 # create async_engine
 async_engine = create_async_engine(
     settings.DATABASE_URL,
@@ -19,10 +24,22 @@ async_engine = create_async_engine(
     pool_pre_ping=settings.DB_POOL_PRE_PING,
     pool_timeout=settings.DB_POOL_TIMEOUT,
     pool_recycle=settings.DB_POOL_RECYCLE,
-    connect_args={
-        "server_settings": {"jit": "off"},
-        "statement_cache_size": 0,  # Disable statement caching
-    },
+    connect_args=CONNECT_ARGS,
+)
+
+# Engine of streamed exports, each download holds one of its connections until
+# it ends. SQLAlchemy's prepared statement cache would reuse unnamed statements
+# the server has already dropped, which breaks server-side cursors, so it's off
+# here only and other queries keep skipping the extra prepare round trip.
+export_engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_size=settings.EXPORT_DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args={**CONNECT_ARGS, "prepared_statement_cache_size": 0},
 )
 
 # create async_session from async_engine
@@ -32,6 +49,12 @@ async_session = async_sessionmaker(
     expire_on_commit=False,
 )
 
+export_session = async_sessionmaker(
+    export_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 
 # create session from async_session
 async def get_session() -> AsyncGenerator[AsyncSession]:
@@ -4,7 +4,8 @@ from app.core.messages import ErrorMessages
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from app.db.session import get_session, AsyncSession
-from app.models.user import User
+from app.services.auth.principal import Principal
+from app.services.auth.user_cache import UserSnapshot
 from app.services.auth.auth import AuthService
 from app.services.auth.password import PasswordService
 from app.services.auth.session import Token, SessionService
@@ -34,13 +35,13 @@ async def get_current_user_payload(
 async def get_current_user(
     token: Annotated[Token, Depends(get_current_user_payload)],
     auth_service: AuthServiceDependency,
-) -> User:
+) -> UserSnapshot:
     return await auth_service.current_user(token)
 
 
 async def get_current_admin_user(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
+    current_user: Annotated[UserSnapshot, Depends(get_current_user)],
+) -> UserSnapshot:
     """Dependency that requires the current user to be an admin."""
     if not current_user.is_admin:
         raise HTTPException(
@@ -50,6 +51,37 @@ async def get_current_admin_user(
     return current_user
 
 
+async def get_current_principal(
+    token: Annotated[Token, Depends(get_current_user_payload)],
+    auth_service: AuthServiceDependency,
+) -> Principal:
+    """
+    Dependency that authorizes from the access token claims alone.
+
+    Falls back to the (cached) user lookup for tokens issued without
+    embedded claims, see `JWT_EMBED_USER_CLAIMS`.
+    """
+    if token.has_user_claims:
+        return Principal.from_token(token)
+    return Principal.from_user(await auth_service.current_user(token))
+
+
+async def get_current_admin_principal(
+    principal: Annotated[Principal, Depends(get_current_principal)],
+) -> Principal:
+    """Dependency that requires the current principal to be an admin."""
+    if not principal.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=ErrorMessages.NOT_ENOUGH_PERMISSIONS,
+        )
+    return principal
+
+
 CurrentUserTokenDependency = Annotated[Token, Depends(get_current_user_payload)]
-CurrentUserDependency = Annotated[User, Depends(get_current_user)]
-CurrentAdminUserDependency = Annotated[User, Depends(get_current_admin_user)]
+CurrentUserDependency = Annotated[UserSnapshot, Depends(get_current_user)]
+CurrentAdminUserDependency = Annotated[UserSnapshot, Depends(get_current_admin_user)]
+CurrentPrincipalDependency = Annotated[Principal, Depends(get_current_principal)]
+CurrentAdminPrincipalDependency = Annotated[
+    Principal, Depends(get_current_admin_principal)
+]
@@ -12,6 +12,7 @@ def http_exception_handler(request: Request, exception: HTTPException) -> JSONRe
             success=False,
             error=Error(code=exception.status_code, message=exception.detail),
         ).model_dump(),
+        headers=exception.headers,
     )
 
 
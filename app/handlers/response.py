@@ -1,16 +1,53 @@
 # app/handlers/response.py
 
+from app.core.config import settings
 from app.core.messages import ErrorMessages
 from slowapi.errors import RateLimitExceeded
+from dataclasses import dataclass
 from functools import wraps
-from typing import Any, Callable, Union
+from typing import Any, Callable, Hashable, Optional, Union
+from fastapi import Request, status
 from fastapi.exceptions import HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
 from app.schemas.response import APIResponse
+from app.services.auth.principal import Principal
+from app.services.auth.user_cache import UserSnapshot
+from app.utils.cache import TTLCache
+from app.utils.singleflight import FlightAbandoned, SingleFlight
 
+import hashlib
+import hmac
+import inspect
 import logging
+import secrets
 
 logger = logging.getLogger(__name__)
 
+# App-scoped in-flight calls of the routes opted into coalescing.
+request_flights = SingleFlight()
+
+# `Response` parameter added to shared routes that don't declare one.
+RESPONSE_PARAMETER = "_shared_response"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# fingerprints cover request bodies holding passwords, so they are keyed hashes.
+_FINGERPRINT_SECRET = secrets.token_bytes(32)
+
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    fingerprint: str
+    result: Any
+    headers: list[tuple[bytes, bytes]]
+
+
+# App-scoped first responses of @idempotent routes keyed by (caller, key).
+idempotency_cache: TTLCache[tuple[Hashable, str], StoredResponse] = TTLCache(
+    settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_TTL_SECONDS
+)
+# In-progress POST requests, duplicates wait for them instead of running.
+idempotent_flights = SingleFlight()
+
 
 def transform_model_to_response(model: Any) -> Union[Any, list[Any], dict[str, Any]]:
     if hasattr(model, "to_response") and callable(model.to_response):
@@ -23,10 +60,126 @@ def transform_model_to_response(model: Any) -> Union[Any, list[Any], dict[str, A
     return model
 
 
-def response_handler() -> Callable:
+def _request(kwargs: dict[str, Any]) -> Request:
+    return next(value for value in kwargs.values() if isinstance(value, Request))
+
+
+def _caller(request: Request, kwargs: dict[str, Any]) -> Hashable:
+    """The principal of a call, else its bearer token, else its client address."""
+    return next(
+        (
+            value.id
+            for value in kwargs.values()
+            if isinstance(value, (Principal, UserSnapshot))
+        ),
+        request.headers.get("authorization")
+        or f"ip:{request.client.host if request.client else None}",
+    )
+
+
+def _coalesce_key(func: Callable, kwargs: dict[str, Any]) -> Hashable:
+    """Route, principal, path and query of a call, plus its conditional header."""
+    request = _request(kwargs)
+    return (
+        func.__module__,
+        func.__qualname__,
+        _caller(request, kwargs),
+        request.url.path,
+        # not normalized, repeated params such as `ids` are order sensitive.
+        request.url.query,
+        request.headers.get("if-none-match"),
+    )
+
+
+def _idempotency_key(kwargs: dict[str, Any]) -> Optional[tuple[Hashable, str]]:
+    request = _request(kwargs)
+    key = request.headers.get("idempotency-key")
+    if key is None:
+        return None
+    if not 0 < len(key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST, ErrorMessages.INVALID_IDEMPOTENCY_KEY
+        )
+    return _caller(request, kwargs), key
+
+
+def _fingerprint(kwargs: dict[str, Any]) -> str:
+    """Keyed hash of the method, path, query and body models of a call."""
+    request = _request(kwargs)
+    digest = hmac.new(_FINGERPRINT_SECRET, digestmod=hashlib.sha256)
+    digest.update(f"{request.method} {request.url.path}?{request.url.query}".encode())
+    for name, value in sorted(kwargs.items()):
+        if isinstance(value, BaseModel):
+            digest.update(name.encode() + value.model_dump_json().encode())
+    return digest.hexdigest()
+
+
+async def _idempotent_call(
+    key: tuple[Hashable, str], fingerprint: str, call: Callable
+) -> tuple[Any, list[tuple[bytes, bytes]]]:
+    executed = False
+
+    async def run() -> StoredResponse:
+        nonlocal executed
+        executed = True
+        result, headers = await call()
+        stored = StoredResponse(fingerprint, result, headers)
+        # errors raise before this, so failed requests run again when retried.
+        # streamed bodies are consumed once and can't be replayed.
+        if not isinstance(result, StreamingResponse):
+            idempotency_cache.set(key, stored)
+        return stored
+
+    stored = idempotency_cache.get(key)
+    if stored is None:
+        try:
+            stored = await idempotent_flights.do(key, run, take_over=False)
+        except FlightAbandoned:
+            # the interrupted request may have committed before it was
+            # cancelled, running it again could apply it twice.
+            raise HTTPException(
+                status.HTTP_409_CONFLICT, ErrorMessages.IDEMPOTENT_REQUEST_INTERRUPTED
+            )
+    if stored.fingerprint != fingerprint:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_CONTENT, ErrorMessages.IDEMPOTENCY_KEY_REUSED
+        )
+    if executed:
+        return stored.result, stored.headers
+    return stored.result, [*stored.headers, (b"idempotent-replayed", b"true")]
+
+
+def _add_response_parameter(wrapper: Callable) -> None:
+    """Have FastAPI pass a `Response`, so replayed calls can set their headers."""
+    signature = inspect.signature(wrapper)
+    parameters = list(signature.parameters.values())
+    if any(parameter.annotation is Response for parameter in parameters):
+        return
+    response = inspect.Parameter(
+        RESPONSE_PARAMETER, inspect.Parameter.KEYWORD_ONLY, annotation=Response
+    )
+    wrapper.__signature__ = signature.replace(  # type: ignore
+        parameters=[*parameters, response]
+    )
+
+
+def response_handler(
+    coalesce: bool = False,
+    max_waiters: Optional[int] = None,
+    idempotent: bool = False,
+) -> Callable:
+    """
+    Wrap an endpoint's result in an `APIResponse`.
+
+    With `coalesce`, identical concurrent calls share a single execution of
+    the endpoint, see `request_flights`. With `idempotent`, requests sending
+    an `Idempotency-Key` run once per caller and key, retries replay the
+    stored response, see `idempotency_cache`. Headers set on the `Response`
+    parameter are copied to every call sharing an execution.
+    """
+
     def decorator(func: Callable):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
+        async def handle(*args, **kwargs):
             try:
                 result = await func(*args, **kwargs)
             except (HTTPException, RateLimitExceeded):
@@ -37,6 +190,10 @@ def response_handler() -> Callable:
                     status_code=500, detail=ErrorMessages.INTERNAL_SERVER_ERROR
                 )
 
+            # responses such as streamed exports are returned untouched.
+            if isinstance(result, Response):
+                return result
+
             # transform models using their to_response() func.
             result = transform_model_to_response(result)
 
@@ -57,6 +214,37 @@ def response_handler() -> Callable:
                 data=result,
             )
 
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            response = kwargs.pop(RESPONSE_PARAMETER, None)
+            key = _idempotency_key(kwargs) if idempotent else None
+            if not coalesce and key is None:
+                return await handle(*args, **kwargs)
+
+            if response is None:
+                response = next(
+                    (value for value in kwargs.values() if isinstance(value, Response)),
+                    None,
+                )
+
+            async def call():
+                result = await handle(*args, **kwargs)
+                return result, list(response.raw_headers) if response else []
+
+            if key is not None:
+                result, headers = await _idempotent_call(
+                    key, _fingerprint(kwargs), call
+                )
+            else:
+                result, headers = await request_flights.do(
+                    _coalesce_key(func, kwargs), call, max_waiters
+                )
+            if response is not None:
+                response.raw_headers[:] = headers
+            return result
+
+        if coalesce or idempotent:
+            _add_response_parameter(wrapper)
         return wrapper
 
     return decorator
@@ -1,11 +1,13 @@
 # app/models/product.py
-from app.schemas.product import ProductResponse
+from app.schemas.product import ProductResponse, ProductSearchResponse
 from app.models.common import BaseMixin
+from app.utils.etag import make_etag
 from typing import TYPE_CHECKING
 from uuid import UUID as PyUUID
 from app.db.session import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import UUID, String, Float, Integer, ForeignKey
+from sqlalchemy import UUID, String, Float, Integer, ForeignKey, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -24,14 +26,52 @@ class Product(BaseMixin, Base):
     description: Mapped[str] = mapped_column(String(255), nullable=False)
     price: Mapped[float] = mapped_column(Float, nullable=False)
     stock: Mapped[int] = mapped_column(Integer, nullable=False)
+    # bumped by every update, backs ETags and If-Match checks
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
+    # weighted full-text document, name (A) ranks above description (B)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     user: Mapped["User"] = relationship("User", back_populates="products")
 
+    # (user_id, sort column, id) indexes serve keyset pagination for every sort_by,
+    # nullable updated_at also needs one matching DESC NULLS LAST,
+    # the trigram index on name is created by migration only when pg_trgm exists,
+    # the (user_id, lower(name) text_pattern_ops) prefix index is migration-only.
+    __table_args__ = tuple(
+        Index(f"ix_products_user_id_{column}_id", "user_id", column, "id")
+        for column in ["created_at", "updated_at", "name", "price", "stock"]
+    ) + (
+        Index(
+            "ix_products_user_id_updated_at_desc_id",
+            "user_id",
+            text("updated_at DESC NULLS LAST"),
+            text("id DESC"),
+        ),
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     def __repr__(self):
         return f"Product(id={self.id}, name={self.name}, description={self.description} price={self.price} stock={self.stock})"
 
     def __str__(self):
         return f"Product(id={self.id}, name={self.name}, description={self.description} price={self.price} stock={self.stock})"
 
+    @property
+    def etag(self) -> str:
+        return make_etag(self.id, self.version)
+
     def to_response(self):
+        # search listings attach `relevance`/`snippet` to each product.
+        if hasattr(self, "relevance"):
+            return ProductSearchResponse.model_validate(self, from_attributes=True)
         return ProductResponse.model_validate(self, from_attributes=True)
@@ -4,7 +4,7 @@ from app.models.common import BaseMixin
 from enum import Enum
 from app.db.session import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Boolean, Enum as SQLAlchemyEnum
+from sqlalchemy import Index, String, Boolean, Integer, Enum as SQLAlchemyEnum, text
 from typing import TYPE_CHECKING
 from app.schemas.user import UserResponse
 
@@ -31,9 +31,24 @@ class User(BaseMixin, Base):
     role: Mapped[UserRole] = mapped_column(
         SQLAlchemyEnum(UserRole), nullable=False, default=UserRole.USER
     )
+    # bumped to invalidate every access token issued to the user.
+    token_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     products: Mapped[list["Product"]] = relationship("Product", back_populates="user")
 
+    __table_args__ = tuple(
+        Index(f"ix_users_{column}_id", column, "id")
+        for column in ["created_at", "updated_at", "name", "email"]
+    ) + (
+        Index(
+            "ix_users_updated_at_desc_id",
+            text("updated_at DESC NULLS LAST"),
+            text("id DESC"),
+        ),
+    )
+
     def __repr__(self):
         return f"User(id={self.id}, name={self.name}, email={self.email})"
 
@@ -21,7 +21,7 @@ from app.schemas.auth import (
 
 from app.schemas.response import APIResponse
 from app.schemas.user import UserResponse, UpdateUserRequest
-from app.utils.router import AutoAPIResponseRouter
+from app.utils.router import AutoAPIResponseRouter, idempotent
 
 from app.core.slowapi import limiter
 
@@ -34,6 +34,7 @@ router = AutoAPIResponseRouter(prefix="/auth", tags=["Auth"])
     summary="Register a new user",
     description="Create a new user account with the provided details.",
 )
+@idempotent
 async def signup(
     request: Request, payload: SignupRequest, auth_service: AuthServiceDependency
 ):
@@ -52,14 +53,17 @@ async def signup(
     description="Authenticate a user and return an access token and refresh token.",
 )
 async def login(
-    request: Request, payload: LoginRequest, auth_service: AuthServiceDependency
+    request: Request,
+    payload: LoginRequest,
+    auth_service: AuthServiceDependency,
+    background_tasks: BackgroundTasks,
 ):
     """
     Login user.
 
     This endpoint authenticates a user with their email and password.
     """
-    return await auth_service.login(request, payload)
+    return await auth_service.login(request, payload, background_tasks)
 
 
 @router.post(
@@ -157,6 +161,25 @@ async def revoke(
     return await auth_service.revoke(user, session_id)
 
 
+@router.post(
+    "/sessions/revoke-all",
+    response_model=APIResponse[MessageResponse],
+    summary="Revoke all sessions",
+    description="Revoke every session of the current user and invalidate all issued access tokens.",
+)
+async def revoke_all(
+    request: Request,
+    user: CurrentUserDependency,
+    auth_service: AuthServiceDependency,
+):
+    """
+    Revoke all sessions.
+
+    This endpoint logs the user out everywhere, including the current device.
+    """
+    return await auth_service.revoke_all(user)
+
+
 @router.patch(
     "/update",
     response_model=APIResponse[UserResponse],
@@ -1,13 +1,22 @@
-from app.schemas.product import ProductParams
+from app.schemas.product import ProductParams, SuggestParams
 from app.schemas.product import UpdateProductRequest
-from typing import Annotated
+from typing import Annotated, Optional, Union
 from uuid import UUID
-from fastapi import Depends, Request, Query
+from fastapi import BackgroundTasks, Depends, Request, Response, Query
 from app.schemas.product import CreateProductRequest
-from app.utils.router import AutoAPIResponseRouter
-from app.dependencies import ProductServiceDependency, CurrentUserDependency
+from app.schemas.product import BulkCreateProductsRequest, BulkCreateProductsResponse
+from app.schemas.product import BulkUpdateProductsRequest, BulkUpdateProductsResponse
+from app.schemas.product import ProductBatchItem, ProductImportSummary
+from app.core.config import settings
+from app.services.product_import import ImportFormat
+from app.utils.etag import etag_matches, hash_etag, make_etag, not_modified
+from app.utils.export import ExportFormat
+from fastapi.responses import StreamingResponse
+from app.utils.router import AutoAPIResponseRouter, coalesce, idempotent
+from app.core.slowapi import limiter
+from app.dependencies import ProductServiceDependency, CurrentPrincipalDependency
 from app.schemas.response import APIResponse
-from app.schemas.product import ProductResponse
+from app.schemas.product import ProductResponse, ProductSearchResponse
 
 router = AutoAPIResponseRouter(
     prefix="/products",
@@ -21,9 +30,11 @@ router = AutoAPIResponseRouter(
     summary="Create a new product",
     description="Create a new product with the provided details.",
 )
+@idempotent
 async def create_products(
     request: Request,
-    user: CurrentUserDependency,
+    response: Response,
+    user: CurrentPrincipalDependency,
     service: ProductServiceDependency,
     payload: CreateProductRequest,
 ):
@@ -32,18 +43,145 @@ async def create_products(
 
     This endpoint creates a new product associated with the specific user.
     """
-    return await service.create_product(user.id, payload)
+    product = await service.create_product(user.id, payload)
+    response.headers["ETag"] = product.etag
+    return product
+
+
+@router.post(
+    "/bulk",
+    response_model=APIResponse[BulkCreateProductsResponse],
+    summary="Create products in bulk",
+    description="Create many products at once, reporting validation errors per item.",
+)
+@idempotent
+async def bulk_create_products(
+    request: Request,
+    user: CurrentPrincipalDependency,
+    service: ProductServiceDependency,
+    payload: BulkCreateProductsRequest,
+):
+    """
+    Create products in bulk.
+
+    This endpoint creates every valid item in a single insert and returns
+    the created products along with the errors of the invalid items.
+    """
+    return await service.create_products(user.id, payload)
+
+
+@router.patch(
+    "/bulk",
+    response_model=APIResponse[BulkUpdateProductsResponse],
+    summary="Update products in bulk",
+    description="Apply partial updates to many products in a single statement.",
+)
+async def bulk_update_products(
+    request: Request,
+    user: CurrentPrincipalDependency,
+    service: ProductServiceDependency,
+    payload: BulkUpdateProductsRequest,
+):
+    """
+    Update products in bulk.
+
+    This endpoint updates the user's products and reports the items whose
+    product does not exist or belongs to someone else.
+    """
+    return await service.update_products(user.id, payload)
+
+
+@router.post(
+    "/import",
+    response_model=APIResponse[ProductImportSummary],
+    summary="Import products",
+    description="Stream a CSV or NDJSON file of products into the catalog.",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_products(
+    request: Request,
+    user: CurrentPrincipalDependency,
+    service: ProductServiceDependency,
+    background_tasks: BackgroundTasks,
+    format: Annotated[
+        Optional[ImportFormat],
+        Query(description="File format, defaults to the request content type"),
+    ] = None,
+    background: Annotated[
+        bool, Query(description="Run as a background job and return its id")
+    ] = False,
+):
+    """
+    Import products.
+
+    This endpoint validates every record like `POST /products` and copies the
+    valid ones into the catalog, returning how many were accepted and rejected.
+    `Idempotency-Key` is not honored, every request runs its import.
+    """
+    return await service.import_products(
+        request, user.id, format, background, background_tasks
+    )
+
+
+@router.get(
+    "/import/{job_id}",
+    response_model=APIResponse[ProductImportSummary],
+    summary="Get import job",
+    description="Retrieve the progress of a background product import.",
+)
+async def get_import_job(
+    request: Request,
+    user: CurrentPrincipalDependency,
+    service: ProductServiceDependency,
+    job_id: str,
+):
+    """
+    Get import job.
+
+    This endpoint returns the status and counters of a background import.
+    """
+    return service.get_import_job(user.id, job_id)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export products",
+    description="Stream all of the user's products as CSV or NDJSON.",
+)
+async def export_products(
+    request: Request,
+    user: CurrentPrincipalDependency,
+    service: ProductServiceDependency,
+    format: Annotated[ExportFormat, Query(description="File format")] = "ndjson",
+):
+    """
+    Export products.
+
+    This endpoint streams every product of the user, oldest first.
+    """
+    return service.export_products(user.id, format)
 
 
 @router.get(
     "",
-    response_model=APIResponse[list[ProductResponse]],
+    response_model=APIResponse[list[Union[ProductSearchResponse, ProductResponse]]],
     summary="Get all products",
     description="Retrieve a paginated list of all products.",
 )
+@coalesce()
 async def get_products(
     request: Request,
-    user: CurrentUserDependency,
+    response: Response,
+    user: CurrentPrincipalDependency,
     service: ProductServiceDependency,
     params: ProductParams = Depends(),
 ):
@@ -51,8 +189,69 @@ async def get_products(
     Get all products.
 
     This endpoint retrieves all products created by the user.
+    Supports `If-None-Match` with the page's ETag. Identical concurrent
+    requests share a single query.
     """
-    return await service.get_products(user.id, params)
+    products = await service.get_products(user.id, params)
+
+    # the page ETag covers its products' versions and the metadata.
+    etag = hash_etag(
+        [
+            str(request.query_params),
+            [(product.id, product.version) for product in products["items"]],
+            products["metadata"],
+        ]
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return products
+
+
+@router.get(
+    "/suggest",
+    response_model=APIResponse[list[str]],
+    summary="Suggest product names",
+    description="Return product name completions for a prefix, for search-as-you-type.",
+)
+@limiter.limit("120/minute")
+async def suggest_products(
+    request: Request,
+    user: CurrentPrincipalDependency,
+    service: ProductServiceDependency,
+    params: SuggestParams = Depends(),
+):
+    """
+    Suggest product names.
+
+    This endpoint returns the user's product names starting with the prefix.
+    """
+    return await service.suggest_names(user.id, params)
+
+
+@router.get(
+    "/batch",
+    response_model=APIResponse[list[ProductBatchItem]],
+    summary="Get products by IDs",
+    description="Retrieve many products by their IDs in a single request.",
+)
+@coalesce()
+async def get_products_batch(
+    request: Request,
+    user: CurrentPrincipalDependency,
+    service: ProductServiceDependency,
+    ids: Annotated[
+        list[UUID],
+        Query(min_length=1, max_length=settings.PRODUCT_BATCH_MAX_IDS),
+    ],
+):
+    """
+    Get products by IDs.
+
+    This endpoint returns one entry per requested ID, in request order, with
+    `found` set to false for products that don't exist or aren't the user's.
+    """
+    return await service.get_products_by_ids(user.id, ids)
 
 
 @router.get(
@@ -61,9 +260,11 @@ async def get_products(
     summary="Get product by ID",
     description="Retrieve a specific product by its unique ID.",
 )
+@coalesce()
 async def get_product(
     request: Request,
-    user: CurrentUserDependency,
+    response: Response,
+    user: CurrentPrincipalDependency,
     service: ProductServiceDependency,
     product_id: UUID,
 ):
@@ -71,8 +272,18 @@ async def get_product(
     Get product by ID.
 
     This endpoint retrieves the details of a specific product.
+    Supports `If-None-Match`, checked against the version before loading the row.
     """
-    return await service.get_product(user.id, product_id)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        version = await service.get_product_version(user.id, product_id)
+        etag = make_etag(product_id, version)
+        if version is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    product = await service.get_product(user.id, product_id)
+    response.headers["ETag"] = product.etag
+    return product
 
 
 @router.delete(
@@ -83,7 +294,7 @@ async def get_product(
 )
 async def delete_products(
     request: Request,
-    user: CurrentUserDependency,
+    user: CurrentPrincipalDependency,
     service: ProductServiceDependency,
     product_ids: Annotated[list[UUID], Query()],
 ):
@@ -103,7 +314,8 @@ async def delete_products(
 )
 async def update_product(
     request: Request,
-    user: CurrentUserDependency,
+    response: Response,
+    user: CurrentPrincipalDependency,
     service: ProductServiceDependency,
     product_id: UUID,
     payload: UpdateProductRequest,
@@ -112,5 +324,10 @@ async def update_product(
     Update product.
 
     This endpoint allows updating the details of an existing product.
+    With `If-Match`, the update is rejected with 412 if the product changed.
     """
-    return await service.update_product(user.id, product_id, payload)
+    product = await service.update_product(
+        user.id, product_id, payload, request.headers.get("if-match")
+    )
+    response.headers["ETag"] = product.etag
+    return product
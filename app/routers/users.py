@@ -1,11 +1,14 @@
 from app.schemas.user import UserParams
 from app.dependencies import UserServiceDependency
-from fastapi import Request, Depends
+from typing import Annotated
+from fastapi import Request, Depends, Query
+from fastapi.responses import StreamingResponse
 
 from app.utils.router import AutoAPIResponseRouter
-from app.dependencies import CurrentAdminUserDependency
+from app.dependencies import CurrentAdminPrincipalDependency
 from app.schemas.user import UserResponse
 from app.schemas.response import APIResponse
+from app.utils.export import ExportFormat
 
 
 router = AutoAPIResponseRouter(
@@ -22,7 +25,7 @@ router = AutoAPIResponseRouter(
 )
 async def get_users(
     request: Request,
-    current_admin_user: CurrentAdminUserDependency,
+    current_admin_user: CurrentAdminPrincipalDependency,
     service: UserServiceDependency,
     params: UserParams = Depends(),
 ):
@@ -33,3 +36,24 @@ async def get_users(
     It is restricted to admin users only.
     """
     return await service.get_users(params)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export users",
+    description="Stream all users as CSV or NDJSON. Requires admin privileges.",
+)
+async def export_users(
+    request: Request,
+    current_admin_user: CurrentAdminPrincipalDependency,
+    service: UserServiceDependency,
+    format: Annotated[ExportFormat, Query(description="File format")] = "ndjson",
+):
+    """
+    Export users.
+
+    This endpoint streams every user in the system, oldest first.
+    It is restricted to admin users only.
+    """
+    return service.export_users(format)
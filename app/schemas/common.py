@@ -19,6 +19,22 @@ class QueryParams(BaseModel):
     sort_order: Annotated[
         Literal["asc", "desc"], Field("desc", description="Sort order")
     ]
+    cursor: Annotated[
+        Optional[str],
+        Field(
+            None,
+            description="Opaque `next_cursor` of a previous page, enables keyset pagination",
+        ),
+    ]
+
+    count: Annotated[
+        Literal["exact", "none", "cached", "estimate"],
+        Field(
+            "exact",
+            description="How the total is computed: exact count, none, "
+            "cached exact count or planner estimate",
+        ),
+    ]
 
     @property
     def offset(self):
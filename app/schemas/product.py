@@ -1,8 +1,11 @@
+from app.core.config import settings
 from app.schemas.common import UUIDStr
 from app.schemas.common import QueryParams
+from app.schemas.response import ErrorDetail
+from app.utils.etag import make_etag
 from datetime import datetime
-from pydantic import BaseModel, Field
-from typing import Optional, Annotated, Literal
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from typing import Any, Optional, Annotated, Literal
 
 
 NameField = Annotated[
@@ -26,8 +29,41 @@ StockField = Annotated[int, Field(..., ge=0, le=100, examples=[5])]
 
 class ProductParams(QueryParams):
     sort_by: Annotated[
-        Literal["created_at", "updated_at", "name", "price", "stock"],
-        Field("created_at", description="Field to sort by"),
+        Literal["created_at", "updated_at", "name", "price", "stock", "relevance"],
+        Field(
+            "created_at",
+            description="Field to sort by, `relevance` requires a search query",
+        ),
+    ]
+
+    min_price: Annotated[Optional[float], Field(None, ge=0, description="Min price")]
+    max_price: Annotated[Optional[float], Field(None, ge=0, description="Max price")]
+    in_stock: Annotated[
+        Optional[bool],
+        Field(None, description="Only products with (true) or without (false) stock"),
+    ]
+    low_stock: Annotated[
+        bool,
+        Field(False, description="Only products at or below the low stock threshold"),
+    ]
+    created_after: Annotated[
+        Optional[datetime], Field(None, description="Created at or after")
+    ]
+    created_before: Annotated[
+        Optional[datetime], Field(None, description="Created before")
+    ]
+    facets: Annotated[
+        bool,
+        Field(False, description="Include price buckets and stock counts in `meta`"),
+    ]
+
+
+class SuggestParams(BaseModel):
+    prefix: Annotated[
+        str, Field(..., min_length=1, max_length=100, description="Name prefix")
+    ]
+    limit: Annotated[
+        int, Field(10, ge=1, le=20, description="Number of suggestions")
     ]
 
 
@@ -38,6 +74,19 @@ class CreateProductRequest(BaseModel):
     stock: StockField
 
 
+class BulkCreateProductsRequest(BaseModel):
+    # items are validated one by one so errors can be reported per item.
+    items: Annotated[
+        list[dict[str, Any]],
+        Field(
+            ...,
+            min_length=1,
+            max_length=settings.PRODUCT_BULK_MAX_ITEMS,
+            description="Products to create, each shaped like `CreateProductRequest`",
+        ),
+    ]
+
+
 class UpdateProductRequest(BaseModel):
     name: Optional[NameField] = None
     description: Optional[DescriptionField] = None
@@ -45,6 +94,24 @@ class UpdateProductRequest(BaseModel):
     stock: Optional[StockField] = None
 
 
+class BulkUpdateProductItem(UpdateProductRequest):
+    id: UUIDStr
+
+
+class BulkUpdateProductsRequest(BaseModel):
+    items: Annotated[
+        list[BulkUpdateProductItem],
+        Field(..., min_length=1, max_length=settings.PRODUCT_BULK_MAX_ITEMS),
+    ]
+
+    @field_validator("items")
+    @classmethod
+    def unique_ids(cls, items: list[BulkUpdateProductItem]):
+        if len({item.id for item in items}) != len(items):
+            raise ValueError("Each product may only be updated once per request")
+        return items
+
+
 class ProductResponse(BaseModel):
     id: UUIDStr
     user_id: UUIDStr
@@ -52,6 +119,59 @@ class ProductResponse(BaseModel):
     description: str
     price: float
     stock: int
+    version: int
 
     created_at: datetime
     updated_at: Optional[datetime]
+
+    @property
+    def etag(self) -> str:
+        return make_etag(self.id, self.version)
+
+
+class ProductSearchResponse(ProductResponse):
+    relevance: float
+    snippet: Optional[str] = None
+
+
+class ProductBatchItem(BaseModel):
+    id: UUIDStr
+    found: bool
+    product: Optional[ProductResponse] = None
+
+
+class BulkItemError(BaseModel):
+    index: int
+    details: list[ErrorDetail]
+
+    @classmethod
+    def from_validation_error(cls, index: int, error: ValidationError):
+        return cls(
+            index=index,
+            details=[
+                ErrorDetail(
+                    field=".".join(str(loc) for loc in detail["loc"]),
+                    message=detail["msg"],
+                )
+                for detail in error.errors()
+            ],
+        )
+
+
+class BulkCreateProductsResponse(BaseModel):
+    created: list[ProductResponse]
+    errors: list[BulkItemError]
+
+
+class BulkUpdateProductsResponse(BaseModel):
+    updated: list[ProductResponse]
+    errors: list[BulkItemError]
+
+
+class ProductImportSummary(BaseModel):
+    job_id: Optional[str] = None
+    status: Literal["pending", "running", "completed", "failed"] = "pending"
+    accepted: int = 0
+    rejected: int = 0
+    # index is the 0-based record number in the file, header excluded.
+    errors: list[BulkItemError] = []
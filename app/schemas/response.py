@@ -1,6 +1,6 @@
 # app/schemas/response.py
 
-from typing import Generic, TypeVar, List, Optional
+from typing import Any, Generic, TypeVar, List, Optional
 from pydantic import BaseModel
 
 T = TypeVar("T")
@@ -9,11 +9,14 @@ T = TypeVar("T")
 class PaginationMetadata(BaseModel):
     page: int
     limit: int
-    total: int
+    total: Optional[int] = None
+    count_mode: str = "exact"
+    next_cursor: Optional[str] = None
 
 
 class Metadata(BaseModel):
     pagination: Optional[PaginationMetadata] = None
+    facets: Optional[dict[str, Any]] = None
 
 
 class ErrorDetail(BaseModel):
@@ -6,8 +6,8 @@ from app.models.session import Session
 from app.services.base import BaseService
 from typing import Annotated, Optional, Sequence
 from fastapi import Depends, HTTPException, Request, status
-from app.db.session import AsyncSession, get_session
-from sqlalchemy import select
+from app.db.session import AsyncSession, async_session, get_session
+from sqlalchemy import insert, select, update
 from app.models.user import User
 from app.models.verification_token import TokenType
 from app.services.auth.password import PasswordService
@@ -29,6 +29,12 @@ from app.schemas.auth import (
 from app.schemas.user import UpdateUserRequest
 
 from app.services.auth.session import Token, SessionService
+from app.services.auth.user_cache import (
+    UserSnapshot,
+    user_cache,
+    cache_user,
+    invalidate_user,
+)
 from fastapi import BackgroundTasks
 
 
@@ -68,13 +74,15 @@ class AuthService(BaseService):
             raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_NOT_FOUND)
         return user
 
-    async def _create_user(self, name: str, email: str, password: str):
-        user = User(name=name, email=email, password_hash=password)
-
-        self.session.add(user)
+    async def _create_user(self, name: str, email: str, password: str) -> User:
+        # INSERT ... RETURNING loads server defaults without a refresh SELECT.
+        user = await self.session.scalar(
+            insert(User)
+            .values(name=name, email=email, password_hash=password)
+            .returning(User)
+        )
         await self.session.commit()
-        await self.session.refresh(user)
-        return user
+        return user  # type: ignore
 
     async def signup(self, request: Request, payload: SignupRequest) -> AuthResponse:
         try:
@@ -89,7 +97,30 @@ class AuthService(BaseService):
 
         return AuthResponse(user=user.to_response(), tokens=tokens)
 
-    async def login(self, request: Request, payload: LoginRequest) -> AuthResponse:
+    async def _rehash_password(
+        self, user_id: UUID, password: str, old_password_hash: str
+    ) -> None:
+        """Upgrade a stored hash to the current argon2 parameters."""
+        try:
+            password_hash = await self.password_service.hash_password(password)
+            # runs after the response, so it can't use the request-scoped session.
+            async with async_session() as session:
+                await session.execute(
+                    update(User)
+                    .where(User.id == user_id, User.password_hash == old_password_hash)
+                    .values(password_hash=password_hash)
+                )
+                await session.commit()
+            self.logger.info(f"Rehashed password for {user_id=}")
+        except Exception as e:
+            self.logger.error(f"Failed to rehash password for {user_id=}: {e}")
+
+    async def login(
+        self,
+        request: Request,
+        payload: LoginRequest,
+        background_tasks: BackgroundTasks,
+    ) -> AuthResponse:
         user = await self._find_user(payload.email)
         if not user or not await self.password_service.verify_password(
             payload.password,
@@ -99,6 +130,11 @@ class AuthService(BaseService):
                 status.HTTP_401_UNAUTHORIZED, ErrorMessages.INVALID_CREDENTIALS
             )
 
+        if self.password_service.needs_rehash(user.password_hash):
+            background_tasks.add_task(
+                self._rehash_password, user.id, payload.password, user.password_hash
+            )
+
         tokens = await self.session_service.create_tokens(request, user)
 
         return AuthResponse(user=user.to_response(), tokens=tokens)
@@ -126,7 +162,11 @@ class AuthService(BaseService):
     ) -> MessageResponse:
         return await self.session_service.revoke_refresh_token(payload.refresh_token)
 
-    async def current_user(self, token: Token) -> User:
+    async def current_user(self, token: Token) -> UserSnapshot:
+        cached_user = user_cache.get(token.sub)
+        if cached_user is not None:
+            return cached_user
+
         user = await self._find_user_by_id(
             token.sub  # pyrefly: ignore [bad-argument-type]
         )
@@ -135,25 +175,35 @@ class AuthService(BaseService):
                 status.HTTP_401_UNAUTHORIZED,
                 ErrorMessages.INVALID_OR_EXPIRED_TOKEN.format("access"),
             )
-        return user
+        return cache_user(user)
 
-    async def get_sessions(self, user: User) -> Sequence[Session]:
+    async def get_sessions(self, user: UserSnapshot) -> Sequence[Session]:
         return await self.session_service.find_active_sessions(
             user.id  # pyrefly: ignore [bad-argument-type]
         )
 
-    async def revoke(self, user: User, session_id: UUID) -> MessageResponse:
+    async def revoke(self, user: UserSnapshot, session_id: UUID) -> MessageResponse:
         return await self.session_service.revoke_session(
             user.id,  # pyrefly: ignore [bad-argument-type]
             session_id,
         )
 
-    async def update(self, user: User, payload: UpdateUserRequest) -> User:
-        user.name = payload.name
+    async def revoke_all(self, user: UserSnapshot) -> MessageResponse:
+        return await self.session_service.revoke_all_sessions(user.id)
+
+    async def update(self, user: UserSnapshot, payload: UpdateUserRequest) -> User:
+        db_user = await self.session.scalar(
+            update(User)
+            .where(User.id == user.id)
+            .values(name=payload.name)
+            .returning(User)
+        )
+        if not db_user:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_NOT_FOUND)
 
         await self.session.commit()
-        await self.session.refresh(user)
-        return user
+        invalidate_user(user.id)
+        return db_user
 
     async def forget_password(
         self, request: Request, payload: ForgetPasswordRequest, background_tasks: BackgroundTasks
@@ -182,9 +232,10 @@ class AuthService(BaseService):
         # Consume the token (single-use)
         await self.verification_service.consume_token(token_record)
         await self.session.commit()
+        invalidate_user(user.id)
         return MessageResponse(message=SuccessMessages.PASSWORD_RESET)
 
-    async def send_verification_email(self, user: User, background_tasks: BackgroundTasks) -> MessageResponse:
+    async def send_verification_email(self, user: UserSnapshot, background_tasks: BackgroundTasks) -> MessageResponse:
         """Send email verification link to the current user."""
         if user.email_verified:
             return MessageResponse(message=SuccessMessages.EMAIL_ALREADY_VERIFIED)
@@ -214,24 +265,40 @@ class AuthService(BaseService):
         # Consume the token
         await self.verification_service.consume_token(token_record)
         await self.session.commit()
+        invalidate_user(user.id)
         return MessageResponse(message=SuccessMessages.EMAIL_VERIFIED)
 
     async def change_password(
-        self, request: Request, user: User, payload: ChangePasswordRequest
+        self, request: Request, user: UserSnapshot, payload: ChangePasswordRequest
     ) -> MessageResponse:
+        password_hash = await self.session.scalar(
+            select(User.password_hash).where(User.id == user.id)
+        )
+        if password_hash is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, ErrorMessages.USER_NOT_FOUND)
         if not await self.password_service.verify_password(
-            payload.old_password,
-            user.password_hash,  # pyrefly: ignore [bad-argument-type]
+            payload.old_password, password_hash
         ):
             raise HTTPException(
                 status.HTTP_400_BAD_REQUEST, ErrorMessages.INVALID_CREDENTIALS
             )
 
-        user.password_hash = await self.password_service.hash_password(
-            payload.new_password
+        # only replace the hash that was verified, a concurrent change wins.
+        result = await self.session.execute(
+            update(User)
+            .where(User.id == user.id, User.password_hash == password_hash)
+            .values(
+                password_hash=await self.password_service.hash_password(
+                    payload.new_password
+                )
+            )
         )
+        if result.rowcount == 0:  # type: ignore
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST, ErrorMessages.INVALID_CREDENTIALS
+            )
 
         await self.session.commit()
-        await self.session.refresh(user)
+        invalidate_user(user.id)
 
         return MessageResponse(message=SuccessMessages.PASSWORD_CHANGED)
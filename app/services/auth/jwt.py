@@ -1,5 +1,11 @@
+import hashlib
+import time
+from typing import Optional
+from app.core.config import settings
 from app.core.messages import ErrorMessages
+from app.services.auth.keys import KeyRing
 from app.services.base import BaseService
+from app.utils.cache import TTLCache
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
@@ -13,45 +19,109 @@ class Token:
         token_type: str,
         iat: datetime | float,
         exp: datetime | float,
+        role: Optional[str] = None,
+        email_verified: Optional[bool] = None,
+        ver: Optional[int] = None,
     ):
         self.sub = sub
         self.email = email
         self.type = token_type
         self.iat = iat
         self.exp = exp
+        # optional authorization claims, only present in claims-mode access tokens.
+        self.role = role
+        self.email_verified = email_verified
+        self.ver = ver
+
+    @property
+    def has_user_claims(self) -> bool:
+        return self.role is not None
 
     def get(self, key: str, default=None):
         return getattr(self, key, default)
 
 
+# App-scoped cache of already verified access tokens, keyed by token digest.
+verified_token_cache: TTLCache[str, Token] = TTLCache(
+    settings.JWT_VERIFIED_TOKEN_CACHE_SIZE
+)
+
+
 class JwtService(BaseService):
     def __init__(
-        self, token_type: str, secret_key: str, algorithm: str, expire_minutes: int
+        self,
+        token_type: str,
+        secret_key: str,
+        algorithm: str,
+        expire_minutes: int,
+        cache: Optional[TTLCache[str, Token]] = None,
+        key_ring: Optional[KeyRing] = None,
     ):
         self.token_type = token_type
         self.secret_key = secret_key
         self.algorithm = algorithm
         self.expire_minutes = expire_minutes
+        self.cache = cache
+        # asymmetric keys take precedence over the shared secret when configured.
+        self.key_ring = key_ring
 
         super().__init__()
 
-    def encode_token(self, data: dict) -> str:
+    def _cache_key(self, token: str) -> str:
+        return hashlib.sha256(f"{self.token_type}:{token}".encode()).hexdigest()
+
+    def _cache_token(self, key: str, token: Token) -> None:
+        # never let a cached entry outlive the token's own `exp` claim.
+        if self.cache is not None and isinstance(token.exp, (int, float)):
+            self.cache.set(key, token, ttl=token.exp - time.time())
+
+    def expires_at(self, issued_at: datetime) -> datetime:
+        return issued_at + timedelta(minutes=self.expire_minutes)
+
+    def encode_token(self, data: dict, issued_at: Optional[datetime] = None) -> str:
         payload = data.copy()
-        current_time = datetime.now(timezone.utc)
+        current_time = issued_at or datetime.now(timezone.utc)
 
         payload.update(
             {
                 "type": self.token_type,
                 "iat": current_time,
-                "exp": current_time + timedelta(minutes=self.expire_minutes),
+                "exp": self.expires_at(current_time),
             }
         )
 
+        if self.key_ring:
+            signing_key = self.key_ring.signing_key()
+            return jwt.encode(
+                payload,
+                signing_key.private_key,
+                algorithm=signing_key.algorithm,
+                headers={"kid": signing_key.kid},
+            )
+
         return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
 
+    def _get_verification_key(self, token: str):
+        if not self.key_ring:
+            return self.secret_key, [self.algorithm]
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        verification_key = self.key_ring.verification_key(kid)
+        if verification_key is None:
+            raise JWTError(f"Unknown signing key {kid=}")
+        return verification_key.public_key, [verification_key.algorithm]
+
     def decode_token(self, token: str) -> Token:
+        cache_key = ""
+        if self.cache is not None:
+            cache_key = self._cache_key(token)
+            cached_token = self.cache.get(cache_key)
+            if cached_token is not None:
+                return cached_token
+
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            key, algorithms = self._get_verification_key(token)
+            payload = jwt.decode(token, key, algorithms=algorithms)
 
             # Validate token type
             if payload.get("type") != self.token_type:
@@ -63,13 +133,19 @@ class JwtService(BaseService):
                     ErrorMessages.INVALID_OR_EXPIRED_TOKEN.format(self.token_type),
                 )
 
-            return Token(
+            decoded_token = Token(
                 sub=payload.get("sub", ""),
                 email=payload.get("email", ""),
                 token_type=payload.get("type", ""),
                 iat=payload.get("iat", 0.0),
                 exp=payload.get("exp", 0.0),
+                role=payload.get("role"),
+                email_verified=payload.get("email_verified"),
+                ver=payload.get("ver"),
             )
+            if cache_key:
+                self._cache_token(cache_key, decoded_token)
+            return decoded_token
         except JWTError:
             raise HTTPException(
                 status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,132 @@
+# app/services/auth/keys.py
+
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from jose import jwk
+from jose.backends.base import Key
+
+from app.core.config import JwtKeyConfig, settings
+
+logger = logging.getLogger("Main.KeyRing")
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class SigningKey:
+    def __init__(
+        self,
+        kid: str,
+        algorithm: str,
+        public_key: Key,
+        private_key: Optional[Key] = None,
+        not_before: Optional[datetime] = None,
+        not_after: Optional[datetime] = None,
+    ):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.public_key = public_key
+        self.private_key = private_key
+        self.not_before = _as_utc(not_before)
+        self.not_after = _as_utc(not_after)
+
+    @classmethod
+    def from_config(cls, config: JwtKeyConfig) -> "SigningKey":
+        private_key = None
+        if config.private_key_file:
+            private_pem = Path(config.private_key_file).read_text()
+            private_key = jwk.construct(private_pem, config.algorithm)
+
+        if config.public_key_file:
+            public_pem = Path(config.public_key_file).read_text()
+            public_key = jwk.construct(public_pem, config.algorithm)
+        elif private_key is not None:
+            public_key = private_key.public_key()
+        else:
+            raise ValueError(f"JWT key {config.kid!r} has no key file configured")
+
+        return cls(
+            kid=config.kid,
+            algorithm=config.algorithm,
+            public_key=public_key,
+            private_key=private_key,
+            not_before=config.not_before,
+            not_after=config.not_after,
+        )
+
+    def can_sign(self, now: datetime) -> bool:
+        return (
+            self.private_key is not None
+            and (self.not_before is None or self.not_before <= now)
+            and not self.is_retired(now)
+        )
+
+    def is_retired(self, now: datetime) -> bool:
+        return self.not_after is not None and self.not_after <= now
+
+    def to_jwk(self) -> dict:
+        return {
+            **self.public_key.to_dict(),
+            "kid": self.kid,
+            "alg": self.algorithm,
+            "use": "sig",
+        }
+
+
+class KeyRing:
+    """
+    `kid`-indexed set of asymmetric signing keys.
+
+    Rotation works through overlap windows: a new key is published in the JWKS
+    before its `not_before` so verifiers can pick it up, and the previous key
+    stays verifiable until its `not_after` (at least one token lifetime).
+    """
+
+    def __init__(self, keys: list[SigningKey]):
+        self.keys = {key.kid: key for key in keys}
+
+    @classmethod
+    def from_config(cls, configs: list[JwtKeyConfig]) -> "KeyRing":
+        key_ring = cls([SigningKey.from_config(config) for config in configs])
+        if key_ring:
+            logger.info(f"Loaded JWT key ring with kids={list(key_ring.keys)}")
+        return key_ring
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def signing_key(self) -> SigningKey:
+        """Return the most recently activated key that may sign right now."""
+        now = datetime.now(timezone.utc)
+        candidates = [key for key in self.keys.values() if key.can_sign(now)]
+        if not candidates:
+            raise RuntimeError("No active signing key in the JWT key ring")
+
+        return max(
+            candidates,
+            key=lambda key: key.not_before or datetime.min.replace(tzinfo=timezone.utc),
+        )
+
+    def verification_key(self, kid: Optional[str]) -> Optional[SigningKey]:
+        key = self.keys.get(kid) if kid else None
+        if key is None or key.is_retired(datetime.now(timezone.utc)):
+            return None
+        return key
+
+    def jwks(self) -> dict:
+        now = datetime.now(timezone.utc)
+        return {
+            "keys": [
+                key.to_jwk() for key in self.keys.values() if not key.is_retired(now)
+            ]
+        }
+
+
+# App-scoped key ring for access tokens, empty when HMAC signing is used.
+access_key_ring = KeyRing.from_config(settings.JWT_ACCESS_KEYS)
@@ -1,20 +1,137 @@
 import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
+from typing import Any
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.messages import ErrorMessages
+
+logger = logging.getLogger("Main.PasswordHashPool")
+
+
+def _available_memory() -> int:
+    """Best-effort amount of physical memory in bytes (0 when unknown)."""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+
+def default_concurrency(memory_cost_kib: int) -> int:
+    """Number of concurrent hashes that fit in the configured share of free RAM."""
+    cpu_limit = os.cpu_count() or 1
+    available_memory = _available_memory()
+    if not available_memory:
+        return cpu_limit
+
+    memory_budget = available_memory * settings.PASSWORD_HASH_MEMORY_FRACTION
+    memory_limit = int(memory_budget // (memory_cost_kib * 1024))
+    return max(1, min(cpu_limit, memory_limit))
+
+
+class PasswordHashPool:
+    """
+    Dedicated, size-bounded executor for argon2 work with admission control.
+
+    At most `max_workers` hashes run at once and at most `max_waiting` callers
+    queue behind them; anyone beyond that (or waiting longer than
+    `wait_timeout`) is rejected with 503 instead of piling up memory.
+    """
+
+    def __init__(self, max_workers: int, max_waiting: int, wait_timeout: float):
+        self.max_workers = max_workers
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="argon2"
+        )
+        self._semaphore = asyncio.Semaphore(max_workers)
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._latencies: deque[float] = deque(maxlen=1024)
+
+    def _reject(self, reason: str) -> HTTPException:
+        self.rejected += 1
+        logger.warning(
+            f"Rejected password hash: {reason} {self.waiting=} {self.in_flight=}"
+        )
+        return HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            ErrorMessages.SERVICE_BUSY,
+            headers={"Retry-After": "1"},
+        )
+
+    async def run(self, func, *args):
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            raise self._reject("queue full")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.wait_timeout)
+        except TimeoutError:
+            raise self._reject("queue timeout")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        start_time = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, partial(func, *args))
+        finally:
+            self._latencies.append((time.perf_counter() - start_time) * 1000)
+            self.completed += 1
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, Any]:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2)
+
+        return {
+            "max_workers": self.max_workers,
+            "max_waiting": self.max_waiting,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_ms": {"p50": percentile(0.5), "p99": percentile(0.99)},
+        }
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_MAX_CONCURRENCY
+    or default_concurrency(settings.ARGON2_MEMORY_COST),
+    max_waiting=settings.PASSWORD_HASH_MAX_WAITING,
+    wait_timeout=settings.PASSWORD_HASH_WAIT_TIMEOUT_SECONDS,
+)
 
 
 class PasswordService:
     def __init__(self):
         self.hasher = PasswordHasher(
-            time_cost=3,
-            memory_cost=102400,  # 100 MB
-            parallelism=2,
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
         )
+        self.pool = password_hash_pool
 
     async def _run(self, func, *args):
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, partial(func, *args))
+        return await self.pool.run(func, *args)
 
     async def hash_password(self, password: str) -> str:
         return await self._run(self.hasher.hash, password)
@@ -24,3 +141,7 @@ class PasswordService:
             return await self._run(self.hasher.verify, hashed, password)
         except VerifyMismatchError:
             return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether `hashed` was created with parameters other than the current ones."""
+        return self.hasher.check_needs_rehash(hashed)
@@ -0,0 +1,43 @@
+# app/services/auth/principal.py
+
+from dataclasses import dataclass
+from uuid import UUID
+
+from app.models.user import UserRole
+from app.services.auth.jwt import Token
+from app.services.auth.user_cache import UserSnapshot
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Caller identity and authorization claims, without the full user row."""
+
+    id: UUID
+    email: str
+    role: UserRole
+    email_verified: bool
+    version: int
+
+    @classmethod
+    def from_token(cls, token: Token) -> "Principal":
+        return cls(
+            id=UUID(token.sub),
+            email=token.email,
+            role=UserRole(token.role),
+            email_verified=bool(token.email_verified),
+            version=token.ver or 0,
+        )
+
+    @classmethod
+    def from_user(cls, user: UserSnapshot) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            email_verified=user.email_verified,
+            version=user.token_version,
+        )
+
+    @property
+    def is_admin(self):
+        return self.role == UserRole.ADMIN
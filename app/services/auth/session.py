@@ -2,17 +2,19 @@ from app.core.messages import ErrorMessages
 from app.core.messages import SuccessMessages
 import re
 import hashlib
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime, timezone
 from typing import Annotated, Optional
-from sqlalchemy import not_, select, update, delete
+from sqlalchemy import Insert, insert, not_, or_, select, update, delete
 from fastapi import Depends, Request, HTTPException, status
 
 from app.models.user import User
 from app.models.session import Session
 from app.core.config import settings
 from app.services.base import BaseService
-from app.services.auth.jwt import Token, JwtService
+from app.services.auth.jwt import Token, JwtService, verified_token_cache
+from app.services.auth.keys import access_key_ring
+from app.services.auth.user_cache import token_version_cache, invalidate_user
 from app.db.session import AsyncSession, get_session
 from app.schemas.auth import TokenResponse, MessageResponse
 from typing import Sequence
@@ -27,6 +29,8 @@ class SessionService(BaseService):
             settings.JWT_ACCESS_SECRET_KEY,
             settings.JWT_ALGORITHM,
             settings.JWT_ACCESS_EXPIRE_MINUTES,
+            cache=verified_token_cache,
+            key_ring=access_key_ring,
         )
         self.refresh_token_service = JwtService(
             "refresh",
@@ -40,8 +44,11 @@ class SessionService(BaseService):
     def _hash_str(self, string: str) -> str:
         return hashlib.sha256(string.encode()).hexdigest()
 
+    def _hash_token_parts(self, token_str: str, sub: str, iat: object) -> str:
+        return self._hash_str(f"{token_str}-{sub}-{iat}")
+
     def _hash_token(self, token: Token, token_str: str) -> str:
-        return self._hash_str(f"{token_str}-{token.sub}-{token.iat}")
+        return self._hash_token_parts(token_str, token.sub, token.iat)
 
     def _sanitize_header(self, value: str, max_length: int = 500) -> str:
         """Remove potentially dangerous characters from headers"""
@@ -73,14 +80,37 @@ class SessionService(BaseService):
 
         return device_signature
 
-    async def _create_access_token(self, data: dict) -> str:
-        return self.access_token_service.encode_token(data)
-
-    async def _create_refresh_token(self, data: dict) -> str:
-        return self.refresh_token_service.encode_token(data)
+    async def _create_access_token(
+        self, data: dict, issued_at: Optional[datetime] = None
+    ) -> str:
+        return self.access_token_service.encode_token(data, issued_at)
+
+    async def _create_refresh_token(
+        self, data: dict, issued_at: Optional[datetime] = None
+    ) -> str:
+        return self.refresh_token_service.encode_token(data, issued_at)
+
+    async def _get_token_version(self, user_id: str) -> Optional[int]:
+        token_version = token_version_cache.get(user_id)
+        if token_version is None:
+            result = await self.session.execute(
+                select(User.token_version).where(User.id == user_id)
+            )
+            token_version = result.scalar_one_or_none()
+            if token_version is not None:
+                token_version_cache.set(user_id, token_version)
+        return token_version
 
     async def validate_access_token(self, token: str) -> Token:
-        return self.access_token_service.decode_token(token)
+        token_payload = self.access_token_service.decode_token(token)
+
+        # tokens issued before the user's last revocation carry an older version.
+        if (token_payload.ver or 0) != await self._get_token_version(token_payload.sub):
+            raise HTTPException(
+                status.HTTP_401_UNAUTHORIZED,
+                ErrorMessages.INVALID_OR_EXPIRED_TOKEN.format("access"),
+            )
+        return token_payload
 
     async def validate_refresh_token(self, token: str) -> tuple[Token, Session]:
         token_payload = self.refresh_token_service.decode_token(token)
@@ -101,31 +131,36 @@ class SessionService(BaseService):
         )
         return result.scalar_one_or_none()
 
-    async def _find_user_session(
-        self, user_id: UUID, session_id: UUID
-    ) -> Optional[Session]:
-        result = await self.session.execute(
-            select(Session).where(
-                Session.user_id == user_id,
-                Session.id == session_id,
-                not_(Session.revoked),
-            )
-        )
-        return result.scalar_one_or_none()
+    def _user_claims(self, user: User) -> dict:
+        return {
+            "role": user.role.value,
+            "email_verified": user.email_verified,
+        }
 
     async def create_tokens(
         self, request: Request, user: User, session_id: Optional[UUID] = None
     ) -> TokenResponse:
         payload = {"sub": str(user.id), "email": user.email}
+        access_payload = {**payload, "ver": user.token_version}
+        if settings.JWT_EMBED_USER_CLAIMS:
+            access_payload.update(self._user_claims(user))
+
+        # whole seconds, so `iat` round-trips through the JWT unchanged.
+        issued_at = datetime.now(timezone.utc).replace(microsecond=0)
+        access_token = await self._create_access_token(access_payload, issued_at)
+        # a unique `jti` keeps refresh tokens (and their hashes) distinct even
+        # when issued within the same second.
+        refresh_token = await self._create_refresh_token(
+            {**payload, "jti": uuid4().hex}, issued_at
+        )
 
-        access_token = await self._create_access_token(payload)
-        refresh_token = await self._create_refresh_token(payload)
-
-        # pyrefly: ignore [bad-argument-type]
-        await self._create_session(request, refresh_token, user.id)
-        if session_id:
-            # pyrefly: ignore [bad-argument-type]
-            await self._revoke_session(user.id, session_id)
+        await self._create_session(
+            request,
+            refresh_token,
+            user.id,  # pyrefly: ignore [bad-argument-type]
+            issued_at,
+            session_id,
+        )
 
         return TokenResponse(
             access_token=access_token,
@@ -133,104 +168,157 @@ class SessionService(BaseService):
             token_type="bearer",
         )
 
-    async def cleanup_device_sessions(self, user_id: UUID, device_id: str) -> None:
-        await self.session.execute(
-            delete(Session).where(
-                Session.user_id == user_id,
-                Session.device_id == device_id,
-            )
+    def _build_session_statement(
+        self,
+        user_id: UUID,
+        device_id: str,
+        values: dict,
+        previous_session_id: Optional[UUID] = None,
+    ) -> Insert:
+        """
+        Build a single statement that rotates the user's sessions:
+
+        - deletes previous sessions of the same device
+        - revokes the session being refreshed and any sessions beyond
+          `max_active_sessions` (expired rows are left to the reaper)
+        - inserts the new session
+
+        The CTEs touch disjoint rows, since all data-modifying CTEs of one
+        statement see the same snapshot. Like any single-session revoke, this
+        ends refresh tokens only, the token version is left alone.
+        """
+        current_time = datetime.now(timezone.utc)
+        other_sessions = (
+            Session.user_id == user_id,
+            Session.device_id != device_id,
+            not_(Session.revoked),
         )
 
-    async def cleanup_max_device_sessions(self, user_id: UUID) -> None:
-        subquery = (
+        overflow_sessions = (
             select(Session.id)
-            .where(Session.user_id == user_id)
+            .where(*other_sessions, Session.expires_at >= current_time)
             .order_by(Session.created_at.desc())
-            .offset(self.max_active_sessions)
-        )
-
-        await self.session.execute(
-            update(Session).where(Session.id.in_(subquery)).values(revoked=True)
+            .offset(max(self.max_active_sessions - 1, 0))
         )
+        revoke_conditions = [Session.id.in_(overflow_sessions)]
+        if previous_session_id:
+            revoke_conditions.append(Session.id == previous_session_id)
 
-    async def cleanup_expired_sessions(self, user_id: UUID) -> None:
-        current_time = datetime.now(timezone.utc)
-        await self.session.execute(
+        revoked_sessions = (
             update(Session)
-            .where(
-                Session.user_id == user_id,
-                Session.expires_at < current_time,
-            )
+            .where(*other_sessions, or_(*revoke_conditions))
             .values(revoked=True)
+            .returning(Session.id)
+            .cte("revoked_sessions")
+        )
+        deleted_sessions = (
+            delete(Session)
+            .where(Session.user_id == user_id, Session.device_id == device_id)
+            .returning(Session.id)
+            .cte("deleted_sessions")
+        )
+
+        return (
+            insert(Session)
+            .values(user_id=user_id, device_id=device_id, revoked=False, **values)
+            .returning(Session.id)
+            .add_cte(revoked_sessions, deleted_sessions)
         )
-        await self.session.commit()
 
     async def _create_session(
-        self, request: Request, token: str, user_id: UUID
+        self,
+        request: Request,
+        token: str,
+        user_id: UUID,
+        issued_at: datetime,
+        previous_session_id: Optional[UUID] = None,
     ) -> None:
         try:
-            token_payload = self.refresh_token_service.decode_token(token)
-            token_hash = self._hash_token(token_payload, token)
+            token_hash = self._hash_token_parts(
+                token, str(user_id), int(issued_at.timestamp())
+            )
             device_id = self._generate_device_id(request)
             ip_address = self._extract_ip_address(request)
             user_agent = request.headers.get("User-Agent", "Unknown")[:500]  # Truncate
 
             self.logger.info(f"User logged_in with {device_id=}")
 
-            await self.cleanup_expired_sessions(user_id)
-            await self.cleanup_device_sessions(user_id, device_id)
-            await self.cleanup_max_device_sessions(user_id)
-
-            session = Session(
-                user_id=user_id,
-                device_id=device_id,
-                token_hash=token_hash,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                expires_at=datetime.fromtimestamp(token_payload.exp, timezone.utc),  # type: ignore
+            statement = self._build_session_statement(
+                user_id,
+                device_id,
+                {
+                    "token_hash": token_hash,
+                    "ip_address": ip_address,
+                    "user_agent": user_agent,
+                    "expires_at": self.refresh_token_service.expires_at(issued_at),
+                },
+                previous_session_id,
             )
-
-            self.session.add(session)
+            await self.session.execute(statement)
             await self.session.commit()
         except Exception:
             self.logger.error(f"Error while saving session with {user_id=}")
             await self.session.rollback()
             raise
 
+    async def _revoke_sessions(self, user_id: UUID | str, *conditions) -> int:
+        """
+        Revoke the user's matching sessions, which ends their refresh tokens.
+        Access tokens of other sessions are untouched, so revoking one device
+        never logs out the rest; only `revoke_all_sessions` bumps the version.
+        The caller commits.
+        """
+        result = await self.session.execute(
+            update(Session)
+            .where(Session.user_id == user_id, not_(Session.revoked), *conditions)
+            .values(revoked=True)
+        )
+        revoked = result.rowcount  # type: ignore
+        self.logger.info(f"Revoked {revoked} sessions for {user_id=}")
+        return revoked
+
+    async def _bump_token_version(self, user_id: UUID | str) -> None:
+        """Invalidate every access token issued to the user so far."""
+        version_result = await self.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(token_version=User.token_version + 1)
+            .returning(User.token_version)
+        )
+        token_version = version_result.scalar_one()
+        await self.session.commit()
+
+        token_version_cache.set(str(user_id), token_version)
+        invalidate_user(user_id)
+        self.logger.info(f"Bumped token version for {user_id=} to {token_version=}")
+
     async def revoke_refresh_token(self, token: str) -> MessageResponse:
         token_payload = self.refresh_token_service.decode_token(token)
         token_hash = self._hash_token(token_payload, token)
 
-        await self.session.execute(
-            update(Session)
-            .where(
-                Session.token_hash == token_hash,
-                Session.user_id == token_payload.sub,
-                not_(Session.revoked),
-            )
-            .values(revoked=True)
-        )
+        await self._revoke_sessions(token_payload.sub, Session.token_hash == token_hash)
         await self.session.commit()
         return MessageResponse(message=SuccessMessages.SESSION_LOGGED_OUT)
 
     async def find_active_sessions(self, user_id: UUID) -> Sequence[Session]:
         result = await self.session.execute(
             select(Session)
-            .where(Session.user_id == user_id, not_(Session.revoked))
+            .where(
+                Session.user_id == user_id,
+                not_(Session.revoked),
+                Session.expires_at > datetime.now(timezone.utc),
+            )
             .limit(10)
         )
         return result.scalars().all()
 
-    async def _revoke_session(self, user_id: UUID, session_id: UUID):
-        await self.session.execute(
-            update(Session)
-            .where(Session.id == session_id, Session.user_id == user_id)
-            .values(revoked=True)
-        )
-        await self.session.commit()
-
     async def revoke_session(self, user_id: UUID, session_id: UUID) -> MessageResponse:
-        session = await self._find_user_session(user_id, session_id)
-        if session:
-            await self._revoke_session(user_id, session_id)
+        await self._revoke_sessions(user_id, Session.id == session_id)
+        await self.session.commit()
         return MessageResponse(message=SuccessMessages.SESSION_REVOKED)
+
+    async def revoke_all_sessions(self, user_id: UUID) -> MessageResponse:
+        # one transaction: every session row and every access token at once.
+        await self._revoke_sessions(user_id)
+        await self._bump_token_version(user_id)
+        return MessageResponse(message=SuccessMessages.ALL_SESSIONS_REVOKED)
@@ -0,0 +1,67 @@
+# app/services/auth/user_cache.py
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.models.user import User, UserRole
+from app.schemas.user import UserResponse
+from app.utils.cache import TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Detached, read-only copy of a `User` row served to request handlers."""
+
+    id: UUID
+    name: str
+    email: str
+    email_verified: bool
+    role: UserRole
+    token_version: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            email_verified=user.email_verified,
+            role=user.role,
+            token_version=user.token_version,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+    @property
+    def is_admin(self):
+        return self.role == UserRole.ADMIN
+
+    def to_response(self):
+        return UserResponse.model_validate(self, from_attributes=True)
+
+
+# App-scoped cache of authenticated users, keyed by str(user_id).
+user_cache: TTLCache[str, UserSnapshot] = TTLCache(
+    settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+# App-scoped map of str(user_id) -> current token version.
+token_version_cache: TTLCache[str, int] = TTLCache(
+    settings.USER_CACHE_SIZE, ttl=settings.TOKEN_VERSION_CACHE_TTL_SECONDS
+)
+
+
+def cache_user(user: User) -> UserSnapshot:
+    snapshot = UserSnapshot.from_user(user)
+    user_cache.set(str(user.id), snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id: UUID | str) -> None:
+    user_cache.pop(str(user_id))
@@ -1,18 +1,73 @@
+import csv
+import tempfile
+from app.core.config import settings
 from app.core.messages import ErrorMessages
 from app.schemas.product import UpdateProductRequest
-from uuid import UUID
-from typing import Optional
+from uuid import UUID, uuid4
+from typing import BinaryIO, Optional, Union
 from fastapi.exceptions import HTTPException
 from app.models.product import Product
-from app.schemas.product import CreateProductRequest
+from app.schemas.product import (
+    BulkCreateProductsRequest,
+    BulkCreateProductsResponse,
+    BulkItemError,
+    BulkUpdateProductsRequest,
+    BulkUpdateProductsResponse,
+    CreateProductRequest,
+)
+from app.schemas.product import (
+    ProductBatchItem,
+    ProductImportSummary,
+    ProductResponse,
+    ProductSearchResponse,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from app.utils.etag import etag_matches, if_match_values
+from app.utils.export import ExportFormat, export_response
+from app.schemas.response import ErrorDetail
+from app.services.product_import import (
+    ImportFormat,
+    ProductImporter,
+    import_jobs,
+    read_chunks,
+)
 from app.services.base import BaseService
 
-from fastapi import Depends, status
-from app.db.session import AsyncSession, get_session
+from fastapi import BackgroundTasks, Depends, Request, status
+from app.db.session import AsyncSession, async_session, get_session
 
-from sqlalchemy import select, Select, delete
-from app.schemas.product import ProductParams
-from sqlalchemy import asc, desc, or_, func
+from sqlalchemy import (
+    Select,
+    and_,
+    any_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    select,
+    true,
+    update,
+    values,
+)
+from pydantic import TypeAdapter, ValidationError
+from app.schemas.product import ProductParams, SuggestParams
+from app.utils.pagination import KeysetPaginator
+from app.services.product_cache import product_cache
+from app.services.search import ProductSearch, trigram_enabled
+from app.services.suggest import (
+    PrefixIndex,
+    invalidate_suggestions,
+    store_suggestions,
+    suggest_cache,
+    suggest_generation,
+)
+
+# uploads above this size are spooled to disk for background imports
+IMPORT_SPOOL_SIZE = 1024 * 1024
+
+ProductListAdapter = TypeAdapter(list[Union[ProductSearchResponse, ProductResponse]])
 
 
 class ProductService(BaseService):
@@ -30,106 +85,461 @@ class ProductService(BaseService):
     async def _find_products(self, user_id: UUID, params: ProductParams):
         data_query = select(Product).where(Product.user_id == user_id)
 
+        search = None
+        if params.query:
+            search = ProductSearch(
+                params.query, trigram=await trigram_enabled(self.session)
+            )
+        elif params.sort_by == "relevance":
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST, ErrorMessages.RELEVANCE_REQUIRES_QUERY
+            )
+
         # apply filters
-        data_query = self._apply_filters(data_query, params)
+        data_query = self._apply_filters(data_query, params, search)
 
-        # count total products.
-        count_query = select(func.count()).select_from(data_query.subquery())
+        # apply sorting and pagination
+        columns = None
+        if search:
+            columns = {"relevance": search.relevance(), "snippet": search.snippet()}
+        paginator = KeysetPaginator(self.model, params, columns=columns)
 
-        # apply sorting
-        data_query = self._apply_sorting(data_query, params)
+        items, next_cursor, count = await paginator.execute(self.session, data_query)
+        self.logger.info(
+            f"Found {count} ({params.count}) products for user {user_id=} "
+            f"returned {len(items)} products."
+        )
 
-        # apply pagination
-        data_query = data_query.offset(params.offset).limit(params.limit)
+        metadata = {"pagination": paginator.metadata(count, next_cursor)}
+        if params.facets:
+            metadata["facets"] = await self._find_facets(data_query)
 
-        result = await self.session.execute(data_query)
-        count_result = await self.session.execute(count_query)
+        return {"items": items, "metadata": metadata}
 
-        items = result.scalars().all()
-        count = count_result.scalar()
-        self.logger.info(
-            f"Found {count} products for user {user_id=} returned {len(items)} products."
-        )
+    def _apply_filters(
+        self, query: Select, params: ProductParams, search: Optional[ProductSearch]
+    ) -> Select:
+        # ranges are served by the (user_id, price|stock|created_at, id) indexes.
+        if search:
+            query = query.where(search.condition())
+        if params.min_price is not None:
+            query = query.where(Product.price >= params.min_price)
+        if params.max_price is not None:
+            query = query.where(Product.price <= params.max_price)
+        if params.in_stock is not None:
+            query = query.where(
+                Product.stock > 0 if params.in_stock else Product.stock <= 0
+            )
+        if params.low_stock:
+            query = query.where(
+                Product.stock > 0, Product.stock <= settings.PRODUCT_LOW_STOCK_THRESHOLD
+            )
+        if params.created_after:
+            query = query.where(Product.created_at >= params.created_after)
+        if params.created_before:
+            query = query.where(Product.created_at < params.created_before)
+        return query
+
+    async def _find_facets(self, query: Select) -> dict:
+        """Price buckets and stock counts of the filtered `query`, in one scan."""
+        products = query.subquery()
+        price, stock = products.c.price, products.c.stock
+
+        boundaries = sorted(settings.PRODUCT_PRICE_FACET_BOUNDARIES)
+        buckets = list(zip([None, *boundaries], [*boundaries, None]))
+        price_counts = [
+            func.count().filter(
+                and_(
+                    price >= low if low is not None else true(),
+                    price < high if high is not None else true(),
+                )
+            )
+            for low, high in buckets
+        ]
+        stock_counts = {
+            "in_stock": func.count().filter(stock > 0),
+            "low_stock": func.count().filter(
+                stock > 0, stock <= settings.PRODUCT_LOW_STOCK_THRESHOLD
+            ),
+            "out_of_stock": func.count().filter(stock <= 0),
+        }
 
+        result = await self.session.execute(
+            select(*price_counts, *stock_counts.values()).select_from(products)
+        )
+        counts = list(result.one())
         return {
-            "items": items,
-            "metadata": {
-                "pagination": {
-                    "page": params.page,
-                    "limit": params.limit,
-                    "total": count,
-                }
-            },
+            "price": [
+                {"min": low, "max": high, "count": count}
+                for (low, high), count in zip(buckets, counts)
+            ],
+            "stock": dict(zip(stock_counts, counts[len(buckets) :])),
         }
 
-    def _apply_filters(self, query: Select, params: ProductParams) -> Select:
-        if params.query:
-            query = query.where(
-                or_(
-                    self.model.name.ilike(f"%{params.query}%"),
-                    self.model.description.ilike(f"%{params.query}%"),
-                )
+    async def _build_prefix_index(self, user_id: UUID) -> PrefixIndex:
+        # read before loading, so a write racing the load keeps it out of the cache.
+        generation = suggest_generation(user_id)
+        max_names = settings.SUGGEST_INDEX_MAX_NAMES
+        result = await self.session.execute(
+            select(Product.name).where(Product.user_id == user_id).limit(max_names + 1)
+        )
+        names = result.scalars().all()
+        if len(names) > max_names:
+            self.logger.info(f"Catalog too large for a prefix index {user_id=}.")
+            index = PrefixIndex((), exhaustive=False)
+        else:
+            index = PrefixIndex(names)
+
+        store_suggestions(user_id, index, generation)
+        return index
+
+    async def _find_name_suggestions(self, user_id: UUID, params: SuggestParams):
+        # served by ix_products_user_id_lower_name (text_pattern_ops).
+        lower_name = func.lower(Product.name)
+        result = await self.session.execute(
+            select(Product.name)
+            .where(
+                Product.user_id == user_id,
+                lower_name.startswith(params.prefix.lower(), autoescape=True),
             )
-        return query
+            .group_by(Product.name)
+            .order_by(lower_name, Product.name)
+            .limit(params.limit)
+        )
+        return list(result.scalars().all())
 
-    def _apply_sorting(self, query: Select, params: ProductParams) -> Select:
-        sort_column = getattr(self.model, params.sort_by, "created_at")
-        order_by = asc(sort_column) if params.sort_order == "asc" else desc(sort_column)
+    async def suggest_names(self, user_id: UUID, params: SuggestParams) -> list[str]:
+        index = suggest_cache.get(str(user_id))
+        if index is None and suggest_cache.enabled:
+            index = await self._build_prefix_index(user_id)
 
-        return query.order_by(order_by)
+        if index is not None and index.exhaustive:
+            return index.complete(params.prefix, params.limit)
+        return await self._find_name_suggestions(user_id, params)
 
-    async def get_product(self, user_id: UUID, product_id: UUID):
+    async def _load_product(self, user_id: UUID, product_id: UUID) -> dict:
         product = await self._find_product(user_id, product_id)
         if not product:
             self.logger.warning(f"Product not found {user_id=} {product_id=}.")
             raise HTTPException(
                 status.HTTP_404_NOT_FOUND, ErrorMessages.PRODUCT_NOT_FOUND
             )
-        return product
+        return product.to_response().model_dump(mode="json")
 
-    async def get_products(self, user_id: UUID, params: ProductParams):
+    async def get_product(self, user_id: UUID, product_id: UUID) -> ProductResponse:
+        # only found products are cached, a 404 raises before anything is stored.
+        product = await product_cache.get_or_load(
+            user_id,
+            "product",
+            {"id": str(product_id)},
+            lambda: self._load_product(user_id, product_id),
+        )
+        return ProductResponse.model_validate(product)
+
+    async def get_products_by_ids(
+        self, user_id: UUID, product_ids: list[UUID]
+    ) -> list[ProductBatchItem]:
+        # a single array parameter keeps one statement shape for any number of ids.
+        ids = bindparam("ids", product_ids, type_=ARRAY(PG_UUID))
+        result = await self.session.execute(
+            select(Product).where(Product.user_id == user_id, Product.id == any_(ids))
+        )
+        products = {product.id: product for product in result.scalars().all()}
+        self.logger.info(
+            f"Found {len(products)} of {len(product_ids)} products for {user_id=}."
+        )
+
+        # results follow the request order, unknown ids are marked not found.
+        return [
+            ProductBatchItem(
+                id=product_id,
+                found=product_id in products,
+                product=products[product_id].to_response()
+                if product_id in products
+                else None,
+            )
+            for product_id in product_ids
+        ]
+
+    async def _load_products(self, user_id: UUID, params: ProductParams) -> dict:
         products = await self._find_products(user_id, params)
-        if not products:
+        return {
+            "items": [
+                product.to_response().model_dump(mode="json")
+                for product in products["items"]
+            ],
+            "metadata": products["metadata"],
+        }
+
+    async def get_products(self, user_id: UUID, params: ProductParams):
+        # keyed by the normalized params, hits and misses both return responses.
+        products = await product_cache.get_or_load(
+            user_id,
+            "products",
+            params.model_dump(mode="json"),
+            lambda: self._load_products(user_id, params),
+        )
+        if not products["items"]:
             self.logger.warning(f"Products not found {user_id=}.")
-        return products
+        return {
+            "items": ProductListAdapter.validate_python(products["items"]),
+            "metadata": products["metadata"],
+        }
+
+    async def _invalidate(self, user_id: UUID) -> None:
+        invalidate_suggestions(user_id)
+        await product_cache.invalidate(user_id)
 
     async def create_product(
         self, user_id: UUID, payload: CreateProductRequest
     ) -> Optional[Product]:
-        product = Product(
-            user_id=user_id,
-            name=payload.name,
-            description=payload.description,
-            price=payload.price,
-            stock=payload.stock,
-        )
-        self.logger.info(f"Creating {product}")
+        self.logger.info(f"Creating product {payload.name!r} for {user_id=}")
 
-        self.session.add(product)
+        # INSERT ... RETURNING loads server defaults without a refresh SELECT.
+        product = await self.session.scalar(
+            insert(Product)
+            .values(user_id=user_id, **payload.model_dump())
+            .returning(Product)
+        )
         await self.session.commit()
-        await self.session.refresh(product)
+        await self._invalidate(user_id)
         return product
 
+    async def create_products(
+        self, user_id: UUID, payload: BulkCreateProductsRequest
+    ) -> BulkCreateProductsResponse:
+        rows, errors = [], []
+        for index, item in enumerate(payload.items):
+            try:
+                product = CreateProductRequest.model_validate(item)
+            except ValidationError as e:
+                errors.append(BulkItemError.from_validation_error(index, e))
+                continue
+            rows.append({"user_id": user_id, **product.model_dump()})
+
+        products = []
+        if rows:
+            # one multi-row INSERT ... RETURNING per batch, no refresh SELECTs.
+            result = await self.session.scalars(
+                insert(Product).returning(Product, sort_by_parameter_order=True),
+                rows,
+            )
+            products = list(result.all())
+            await self.session.commit()
+            await self._invalidate(user_id)
+
+        self.logger.info(
+            f"Bulk created {len(products)} products for {user_id=}, "
+            f"{len(errors)} invalid."
+        )
+        return BulkCreateProductsResponse(
+            created=[product.to_response() for product in products], errors=errors
+        )
+
+    async def get_product_version(
+        self, user_id: UUID, product_id: UUID
+    ) -> Optional[int]:
+        return await self.session.scalar(
+            select(Product.version).where(
+                Product.id == product_id, Product.user_id == user_id
+            )
+        )
+
+    def _if_match_versions(self, product_id: UUID, if_match: str) -> list[int]:
+        # our product ETags carry "<id>.<version>".
+        versions = []
+        for value in if_match_values(if_match):
+            tag_id, _, version = value.rpartition(".")
+            if tag_id == str(product_id) and version.isdigit():
+                versions.append(int(version))
+        return versions
+
+    def _precondition_failed(self, user_id: UUID, product_id: UUID):
+        self.logger.warning(f"Stale If-Match {user_id=} {product_id=}.")
+        return HTTPException(
+            status.HTTP_412_PRECONDITION_FAILED, ErrorMessages.PRODUCT_MODIFIED
+        )
+
     async def update_product(
-        self, user_id: UUID, product_id: UUID, payload: UpdateProductRequest
+        self,
+        user_id: UUID,
+        product_id: UUID,
+        payload: UpdateProductRequest,
+        if_match: Optional[str] = None,
     ):
-        product = await self._find_product(user_id, product_id)
+        # only fields sent in the request change, the columns are not nullable.
+        values = payload.model_dump(exclude_unset=True, exclude_none=True)
+        if not values:
+            product = await self.get_product(user_id, product_id)
+            if if_match and not etag_matches(if_match, product.etag):
+                raise self._precondition_failed(user_id, product_id)
+            return product
+
+        conditions = [Product.id == product_id, Product.user_id == user_id]
+        if if_match and if_match.strip() != "*":
+            # optimistic concurrency: the row only changes if nobody else did.
+            versions = self._if_match_versions(product_id, if_match)
+            conditions.append(Product.version.in_(versions))
+
+        self.logger.info(f"Updating {product_id=} for {user_id=} with {values}")
+        product = await self.session.scalar(
+            update(Product)
+            .where(*conditions)
+            .values(**values, version=Product.version + 1)
+            .returning(Product)
+        )
         if not product:
+            if if_match and await self.get_product_version(user_id, product_id):
+                raise self._precondition_failed(user_id, product_id)
             self.logger.warning(f"Product not found {user_id=} {product_id=}.")
             raise HTTPException(
                 status.HTTP_404_NOT_FOUND, ErrorMessages.PRODUCT_NOT_FOUND
             )
 
-        product.name = payload.name or product.name
-        product.description = payload.description or product.description
-        product.price = payload.price or product.price
-        product.stock = payload.stock or product.stock
+        await self.session.commit()
+        await self._invalidate(user_id)
+        return product
+
+    def _resolve_import_format(
+        self, request: Request, format: Optional[ImportFormat]
+    ) -> ImportFormat:
+        if format:
+            return format
+        content_type = request.headers.get("content-type", "")
+        if "csv" in content_type:
+            return "csv"
+        if "ndjson" in content_type or "jsonl" in content_type:
+            return "ndjson"
+        raise HTTPException(
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            ErrorMessages.UNSUPPORTED_IMPORT_FORMAT,
+        )
+
+    async def _run_import_job(
+        self,
+        user_id: UUID,
+        file: BinaryIO,
+        format: ImportFormat,
+        summary: ProductImportSummary,
+    ) -> None:
+        try:
+            # runs after the response, so it can't use the request-scoped session.
+            async with async_session() as session:
+                await ProductImporter(session, user_id, summary).run(
+                    read_chunks(file), format
+                )
+        except Exception as e:
+            summary.status = "failed"
+            self.logger.error(f"Import job {summary.job_id} failed for {user_id=}: {e}")
+        finally:
+            file.close()
+
+    async def import_products(
+        self,
+        request: Request,
+        user_id: UUID,
+        format: Optional[ImportFormat],
+        background: bool,
+        background_tasks: BackgroundTasks,
+    ) -> ProductImportSummary:
+        format = self._resolve_import_format(request, format)
+
+        if background:
+            # the body is gone after the response, spool it for the job.
+            file = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE)
+            async for chunk in request.stream():
+                file.write(chunk)
+            file.seek(0)
+
+            summary = ProductImportSummary(job_id=uuid4().hex)
+            import_jobs.set(f"{user_id}:{summary.job_id}", summary)
+            background_tasks.add_task(
+                self._run_import_job, user_id, file, format, summary
+            )
+            return summary
+
+        try:
+            return await ProductImporter(
+                self.session, user_id, ProductImportSummary()
+            ).run(request.stream(), format)
+        except (UnicodeDecodeError, csv.Error) as e:
+            self.logger.warning(f"Unreadable import for {user_id=}: {e}")
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST, ErrorMessages.INVALID_IMPORT_FILE
+            )
 
-        self.logger.info(f"Updating {product}")
+    def get_import_job(self, user_id: UUID, job_id: str) -> ProductImportSummary:
+        summary = import_jobs.get(f"{user_id}:{job_id}")
+        if not summary:
+            raise HTTPException(
+                status.HTTP_404_NOT_FOUND, ErrorMessages.IMPORT_JOB_NOT_FOUND
+            )
+        return summary
 
+    def export_products(self, user_id: UUID, format: ExportFormat):
+        table = Product.__table__
+        query = select(
+            *(table.c[field] for field in ProductResponse.model_fields)
+        ).where(table.c.user_id == user_id)
+        self.logger.info(f"Exporting products as {format} for {user_id=}.")
+        return export_response(
+            query, [table.c.created_at, table.c.id], format, "products"
+        )
+
+    async def update_products(
+        self, user_id: UUID, payload: BulkUpdateProductsRequest
+    ) -> BulkUpdateProductsResponse:
+        fields = ["name", "description", "price", "stock"]
+        updates = values(
+            column("id", Product.id.type),
+            *(column(field, Product.__table__.c[field].type) for field in fields),
+            name="updates",
+        ).data(
+            [
+                (item.id, *(getattr(item, field) for field in fields))
+                for item in payload.items
+            ]
+        )
+
+        # a single UPDATE ... FROM (VALUES ...), omitted fields keep their value.
+        # casts keep the types of columns that are NULL in every row.
+        result = await self.session.scalars(
+            update(Product)
+            .where(Product.id == updates.c.id, Product.user_id == user_id)
+            .values(
+                {
+                    field: func.coalesce(
+                        cast(updates.c[field], Product.__table__.c[field].type),
+                        getattr(Product, field),
+                    )
+                    for field in fields
+                }
+                | {"version": Product.version + 1}
+            )
+            .returning(Product)
+        )
+        products = list(result.all())
         await self.session.commit()
-        await self.session.refresh(product)
-        return product
+        await self._invalidate(user_id)
+
+        updated_ids = {product.id for product in products}
+        errors = [
+            BulkItemError(
+                index=index,
+                details=[
+                    ErrorDetail(field="id", message=ErrorMessages.PRODUCT_NOT_FOUND)
+                ],
+            )
+            for index, item in enumerate(payload.items)
+            if item.id not in updated_ids
+        ]
+        self.logger.info(
+            f"Bulk updated {len(products)} products for {user_id=}, "
+            f"{len(errors)} not found."
+        )
+        return BulkUpdateProductsResponse(
+            updated=[product.to_response() for product in products], errors=errors
+        )
 
     async def delete_products(self, user_id: UUID, product_ids: list[UUID]):
         result = await self.session.execute(
@@ -138,6 +548,7 @@ class ProductService(BaseService):
             )
         )
         await self.session.commit()
+        await self._invalidate(user_id)
 
         if result.rowcount == 0:
             raise HTTPException(
@@ -0,0 +1,196 @@
+# app/services/product_cache.py
+
+import hashlib
+import itertools
+import json
+from typing import Any, Awaitable, Callable, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.base import BaseService
+from app.utils.cache import TTLCache
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU entries with per-user generation counters.
+
+    Counters are bounded like the entries. A missing counter starts from a
+    process-wide sequence instead of 0, so a counter evicted and created
+    again never matches the generation of entries that are still cached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries: TTLCache[str, bytes] = TTLCache(maxsize, ttl=ttl)
+        self.generations: TTLCache[str, int] = TTLCache(maxsize, ttl=ttl)
+        self._sequence = itertools.count(1)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self.entries.set(key, value)
+
+    async def get_generation(self, key: str) -> int:
+        generation = self.generations.get(key)
+        if generation is None:
+            generation = next(self._sequence)
+            self.generations.set(key, generation)
+        return generation
+
+    async def incr_generation(self, key: str) -> int:
+        generation = next(self._sequence)
+        self.generations.set(key, generation)
+        return generation
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "generations": len(self.generations),
+            "maxsize": self.entries.maxsize,
+        }
+
+
+class RedisCacheBackend:
+    """
+    Entries and generation counters in a Redis-protocol store, shared by every
+    app instance. `client` is a `redis.asyncio` client or a compatible stand-in.
+    """
+
+    def __init__(self, client, ttl: float):
+        self.client = client
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(key, value, px=int(self.ttl * 1000))
+
+    async def get_generation(self, key: str) -> int:
+        return int(await self.client.get(key) or 0)
+
+    async def incr_generation(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    def stats(self) -> dict[str, Any]:
+        return {}
+
+
+class ProductCache(BaseService):
+    """
+    Per-user cache of product read responses.
+
+    Entry keys embed the user's current generation, so bumping it after a
+    write makes every cached response of that user unreachable at once; the
+    orphaned entries then age out through the backend's TTL/LRU.
+    """
+
+    def __init__(self, backend: Optional[Any]):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidations = 0
+        self.stored = 0
+        self.stored_bytes = 0
+        self.max_entry_bytes = 0
+        super().__init__()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _generation_key(self, user_id: UUID) -> str:
+        return f"products:{user_id}:generation"
+
+    def _entry_key(
+        self, user_id: UUID, generation: int, namespace: str, params: Any
+    ) -> str:
+        normalized = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha256(normalized.encode()).hexdigest()[:32]
+        return f"products:{user_id}:{generation}:{namespace}:{digest}"
+
+    async def get_or_load(
+        self,
+        user_id: UUID,
+        namespace: str,
+        params: Any,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the cached JSON value for `params`, or store what `loader` returns."""
+        if not self.backend:
+            return await loader()
+
+        try:
+            generation = await self.backend.get_generation(
+                self._generation_key(user_id)
+            )
+            key = self._entry_key(user_id, generation, namespace, params)
+            cached = await self.backend.get(key)
+        except Exception as e:
+            # the cache must never take reads down with it.
+            self.errors += 1
+            self.logger.error(f"Product cache read failed: {e}")
+            return await loader()
+
+        if cached is not None:
+            self.hits += 1
+            return json.loads(cached)
+
+        self.misses += 1
+        value = await loader()
+        encoded = json.dumps(value, default=str).encode()
+        try:
+            await self.backend.set(key, encoded)
+        except Exception as e:
+            self.errors += 1
+            self.logger.error(f"Product cache write failed: {e}")
+            return value
+
+        self.stored += 1
+        self.stored_bytes += len(encoded)
+        self.max_entry_bytes = max(self.max_entry_bytes, len(encoded))
+        return value
+
+    async def invalidate(self, user_id: UUID) -> None:
+        if not self.backend:
+            return
+        try:
+            await self.backend.incr_generation(self._generation_key(user_id))
+            self.invalidations += 1
+        except Exception as e:
+            self.errors += 1
+            self.logger.error(f"Product cache invalidation failed {user_id=}: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.PRODUCT_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "stored": self.stored,
+            "avg_entry_bytes": round(self.stored_bytes / self.stored)
+            if self.stored
+            else 0,
+            "max_entry_bytes": self.max_entry_bytes,
+            **(self.backend.stats() if self.backend else {}),
+        }
+
+
+def _create_backend():
+    ttl = settings.PRODUCT_CACHE_TTL_SECONDS
+    if settings.PRODUCT_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(settings.PRODUCT_CACHE_SIZE, ttl)
+    if settings.PRODUCT_CACHE_BACKEND == "redis":
+        # optional dependency, only needed with the redis backend.
+        from redis.asyncio import Redis
+
+        return RedisCacheBackend(Redis.from_url(settings.PRODUCT_CACHE_REDIS_URL), ttl)
+    return None
+
+
+product_cache = ProductCache(_create_backend())
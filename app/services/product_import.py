@@ -0,0 +1,273 @@
+# app/services/product_import.py
+
+import codecs
+import csv
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, BinaryIO, Iterator, Literal, Optional
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.messages import ErrorMessages
+from app.models.product import Product
+from app.schemas.product import (
+    BulkItemError,
+    CreateProductRequest,
+    ProductImportSummary,
+)
+from app.schemas.response import ErrorDetail
+from app.services.base import BaseService
+from app.services.product_cache import product_cache
+from app.services.suggest import invalidate_suggestions
+from app.utils.cache import TTLCache
+
+ImportFormat = Literal["csv", "ndjson"]
+
+COPY_COLUMNS = ["user_id", "name", "description", "price", "stock", "created_at"]
+READ_SIZE = 64 * 1024
+
+# App-scoped background import jobs keyed by f"{user_id}:{job_id}".
+import_jobs: TTLCache[str, ProductImportSummary] = TTLCache(
+    settings.PRODUCT_IMPORT_MAX_JOBS, ttl=settings.PRODUCT_IMPORT_JOB_TTL_SECONDS
+)
+
+
+async def read_chunks(file: BinaryIO) -> AsyncIterator[bytes]:
+    while chunk := file.read(READ_SIZE):
+        yield chunk
+
+
+async def _iter_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[Optional[str]]:
+    """Decoded lines, `None` for each one over PRODUCT_IMPORT_MAX_RECORD_LENGTH."""
+    # incremental decoding keeps multi-byte characters split across chunks intact.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    limit = settings.PRODUCT_IMPORT_MAX_RECORD_LENGTH
+    buffer = ""
+    skipping = False
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if skipping:
+                # the end of the over-long line.
+                skipping = False
+                continue
+            too_long = len(line) > limit
+            yield None if too_long else line.removesuffix("\r")
+        if len(buffer) > limit:
+            if not skipping:
+                yield None
+            buffer = ""
+            skipping = True
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer and not skipping:
+        yield None if len(buffer) > limit else buffer
+
+
+class _NeedLines(Exception):
+    pass
+
+
+class _LineFeed:
+    """
+    Lines handed to `csv.reader`, which tracks quoting across them itself.
+
+    Running out of lines inside a record raises `_NeedLines`, the lines read
+    for that record are then put back so it's parsed again with more lines.
+    """
+
+    def __init__(self):
+        self.lines: deque[str] = deque()
+        self.record: list[str] = []
+        self.record_length = 0
+        self.closed = False
+
+    def __iter__(self) -> "_LineFeed":
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            if self.closed:
+                raise StopIteration
+            raise _NeedLines
+        line = self.lines.popleft()
+        self.record.append(line)
+        self.record_length += len(line)
+        return line + "\n"
+
+    def end_record(self) -> None:
+        self.record = []
+        self.record_length = 0
+
+    def retry_record(self) -> None:
+        self.lines.extendleft(reversed(self.record))
+        self.end_record()
+
+
+async def _iter_csv(
+    lines: AsyncIterator[Optional[str]],
+) -> AsyncIterator[Optional[dict[str, str]]]:
+    """Records keyed by the header, `None` for one that is too long."""
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    limit = settings.PRODUCT_IMPORT_MAX_RECORD_LENGTH
+    header = None
+
+    def read() -> Iterator[Optional[dict[str, str]]]:
+        nonlocal header
+        while True:
+            try:
+                values = next(reader)
+            except StopIteration:
+                return
+            except _NeedLines:
+                if feed.record_length > limit:
+                    # e.g. an unclosed quote, don't buffer the rest of the file.
+                    feed.end_record()
+                    yield None
+                else:
+                    feed.retry_record()
+                return
+
+            too_long = feed.record_length > limit
+            feed.end_record()
+            if too_long:
+                yield None
+                continue
+            if not any(value.strip() for value in values):
+                continue
+            if header is None:
+                header = [column.strip() for column in values]
+            else:
+                yield dict(zip(header, values))
+
+    async for line in lines:
+        if line is None:
+            feed.end_record()
+            yield None
+            continue
+        feed.lines.append(line)
+        for row in read():
+            yield row
+
+    feed.closed = True
+    for row in read():
+        yield row
+
+
+async def _iter_ndjson(
+    lines: AsyncIterator[Optional[str]],
+) -> AsyncIterator[Optional[str]]:
+    async for line in lines:
+        if line is None or line.strip():
+            yield line
+
+
+class ProductImporter(BaseService):
+    """
+    Streams CSV or NDJSON rows into `products` with asyncpg COPY.
+
+    Rows are validated against `CreateProductRequest` as they are read and
+    copied in chunks of `PRODUCT_IMPORT_CHUNK_SIZE`, so neither the file nor
+    the accepted rows are held in memory; records longer than
+    `PRODUCT_IMPORT_MAX_RECORD_LENGTH` are rejected rather than buffered.
+    Everything is committed at the end, so `accepted` is only reported once
+    the rows are committed.
+    """
+
+    def __init__(
+        self, session: AsyncSession, user_id: UUID, summary: ProductImportSummary
+    ):
+        self.session = session
+        self.user_id = user_id
+        self.summary = summary
+        self.copied = 0
+        super().__init__()
+
+    def _reject(self, error: BulkItemError) -> None:
+        self.summary.rejected += 1
+        if len(self.summary.errors) < settings.PRODUCT_IMPORT_MAX_ERRORS:
+            self.summary.errors.append(error)
+
+    def _validate(self, row: Any) -> CreateProductRequest:
+        if isinstance(row, str):
+            return CreateProductRequest.model_validate_json(row)
+        return CreateProductRequest.model_validate(row)
+
+    async def _copy(self, records: list[tuple]) -> None:
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(  # type: ignore
+            Product.__tablename__, records=records, columns=COPY_COLUMNS
+        )
+        self.copied += len(records)
+
+    async def run(
+        self, chunks: AsyncIterator[bytes], format: ImportFormat
+    ) -> ProductImportSummary:
+        self.summary.status = "running"
+        # the asyncpg adapter only sends BEGIN with its first statement, a COPY
+        # on the driver connection before that would autocommit chunk by chunk.
+        await self.session.execute(select(1))
+
+        lines = _iter_lines(chunks)
+        rows = _iter_csv(lines) if format == "csv" else _iter_ndjson(lines)
+
+        records: list[tuple] = []
+        index = 0
+        async for row in rows:
+            if row is None:
+                self._reject(
+                    BulkItemError(
+                        index=index,
+                        details=[
+                            ErrorDetail(
+                                field="record",
+                                message=ErrorMessages.IMPORT_RECORD_TOO_LONG,
+                            )
+                        ],
+                    )
+                )
+                index += 1
+                continue
+
+            try:
+                product = self._validate(row)
+            except ValidationError as e:
+                self._reject(BulkItemError.from_validation_error(index, e))
+            else:
+                records.append(
+                    (
+                        self.user_id,
+                        product.name,
+                        product.description,
+                        product.price,
+                        product.stock,
+                        datetime.now(timezone.utc),
+                    )
+                )
+                if len(records) >= settings.PRODUCT_IMPORT_CHUNK_SIZE:
+                    await self._copy(records)
+                    records = []
+            index += 1
+
+        if records:
+            await self._copy(records)
+        await self.session.commit()
+        self.summary.accepted = self.copied
+        invalidate_suggestions(self.user_id)
+        await product_cache.invalidate(self.user_id)
+
+        self.summary.status = "completed"
+        self.logger.info(
+            f"Imported {self.summary.accepted} products for user_id={self.user_id}, "
+            f"{self.summary.rejected} rejected."
+        )
+        return self.summary
@@ -0,0 +1,116 @@
+# app/services/reaper.py
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import ColumnElement, delete, or_, select
+
+from app.core.config import settings
+from app.db.session import async_session
+from app.models.session import Session
+from app.models.verification_token import VerificationToken
+from app.services.base import BaseService
+
+
+class ReaperService(BaseService):
+    """
+    Periodically deletes expired/revoked sessions and expired/used verification
+    tokens in bounded batches, pausing between batches to keep lock time and
+    WAL bursts small. Runs outside of any request on its own DB sessions.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.REAPER_BATCH_SIZE,
+        batch_pause: float = settings.REAPER_BATCH_PAUSE_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+
+        self.runs = 0
+        self.deleted: dict[str, int] = {}
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration_ms = 0.0
+        self.last_error: Optional[str] = None
+        super().__init__()
+
+    async def _delete_batch(self, model, condition: ColumnElement[bool]) -> int:
+        # SKIP LOCKED lets several app instances reap concurrently.
+        batch = (
+            select(model.id)
+            .where(condition)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with async_session() as session:
+            result = await session.execute(
+                delete(model).where(model.id.in_(batch.scalar_subquery()))
+            )
+            await session.commit()
+        return result.rowcount  # type: ignore
+
+    async def _reap(self, model, condition: ColumnElement[bool]) -> int:
+        total = 0
+        while True:
+            deleted = await self._delete_batch(model, condition)
+            total += deleted
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause)
+
+        table = model.__tablename__
+        self.deleted[table] = self.deleted.get(table, 0) + total
+        return total
+
+    async def run_once(self) -> dict[str, int]:
+        current_time = datetime.now(timezone.utc)
+        start_time = time.perf_counter()
+        try:
+            result = {
+                Session.__tablename__: await self._reap(
+                    Session,
+                    or_(Session.expires_at < current_time, Session.revoked),
+                ),
+                VerificationToken.__tablename__: await self._reap(
+                    VerificationToken,
+                    or_(
+                        VerificationToken.expires_at < current_time,
+                        VerificationToken.used,
+                    ),
+                ),
+            }
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+        finally:
+            self.runs += 1
+            self.last_run_at = current_time
+            self.last_duration_ms = (time.perf_counter() - start_time) * 1000
+
+        self.logger.info(f"Reaped {result} in {self.last_duration_ms:.2f}ms")
+        return result
+
+    async def run_forever(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Reaper run failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": round(self.last_duration_ms, 2),
+            "last_error": self.last_error,
+        }
+
+
+reaper = ReaperService()
@@ -0,0 +1,57 @@
+# app/services/search.py
+
+from typing import Optional
+
+from sqlalchemy import REAL, ColumnElement, or_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from app.models.product import Product
+
+# must match the text search config of `products.search_vector`
+SEARCH_CONFIG = "english"
+SNIPPET_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=25, MinWords=10"
+
+_trigram_enabled: Optional[bool] = None
+
+
+async def trigram_enabled(session: AsyncSession) -> bool:
+    """Whether pg_trgm is installed, checked once per process."""
+    global _trigram_enabled
+    if _trigram_enabled is None:
+        result = await session.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        )
+        _trigram_enabled = result.scalar() is not None
+    return _trigram_enabled
+
+
+class ProductSearch:
+    """
+    Full-text product search over the weighted `search_vector` column (GIN),
+    plus typo-tolerant name matching through `pg_trgm` when it is installed.
+    """
+
+    def __init__(self, query: str, trigram: bool = False):
+        self.query = query
+        self.trigram = trigram
+        self.tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+
+    def condition(self) -> ColumnElement[bool]:
+        matches = Product.search_vector.op("@@")(self.tsquery)
+        if self.trigram:
+            # `name %> query` (word similarity) is served by ix_products_name_trgm.
+            matches = or_(matches, Product.name.op("%>")(self.query))
+        return matches
+
+    def relevance(self) -> ColumnElement[float]:
+        # normalization 32 scales the rank into [0, 1).
+        rank = func.ts_rank_cd(Product.search_vector, self.tsquery, 32, type_=REAL)
+        if self.trigram:
+            rank = rank + func.word_similarity(self.query, Product.name, type_=REAL)
+        return rank
+
+    def snippet(self) -> ColumnElement[str]:
+        return func.ts_headline(
+            SEARCH_CONFIG, Product.description, self.tsquery, SNIPPET_OPTIONS
+        )
@@ -0,0 +1,70 @@
+# app/services/suggest.py
+
+from bisect import bisect_left
+from typing import Iterable
+from uuid import UUID
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+
+class PrefixIndex:
+    """
+    Sorted, case-insensitive index of a user's product names.
+
+    An index built with `exhaustive=False` holds no names, it marks a catalog
+    too large to keep in memory so suggestions are served by the database.
+    """
+
+    __slots__ = ("keys", "names", "exhaustive")
+
+    def __init__(self, names: Iterable[str], exhaustive: bool = True):
+        entries = sorted({(name.lower(), name) for name in names})
+        self.keys = [key for key, _ in entries]
+        self.names = [name for _, name in entries]
+        self.exhaustive = exhaustive
+
+    def __len__(self):
+        return len(self.keys)
+
+    def complete(self, prefix: str, limit: int) -> list[str]:
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        end = start
+        while (
+            end < len(self.keys)
+            and end - start < limit
+            and self.keys[end].startswith(prefix)
+        ):
+            end += 1
+        return self.names[start:end]
+
+
+# App-scoped prefix indexes keyed by str(user_id), warmed on first suggest.
+suggest_cache: TTLCache[str, PrefixIndex] = TTLCache(
+    settings.SUGGEST_CACHE_SIZE, ttl=settings.SUGGEST_CACHE_TTL_SECONDS
+)
+
+
+# Per-user write counters, an index built while a write happened is dropped.
+# They only have to outlive a build, expired counters read as 0 and just skip
+# storing the index being built.
+suggest_generations: TTLCache[str, int] = TTLCache(
+    settings.SUGGEST_CACHE_SIZE, ttl=settings.SUGGEST_CACHE_TTL_SECONDS
+)
+
+
+def suggest_generation(user_id: UUID | str) -> int:
+    return suggest_generations.get(str(user_id)) or 0
+
+
+def store_suggestions(user_id: UUID | str, index: PrefixIndex, generation: int) -> None:
+    """Cache `index` unless the user's products changed since `generation`."""
+    if suggest_generation(user_id) == generation:
+        suggest_cache.set(str(user_id), index)
+
+
+def invalidate_suggestions(user_id: UUID | str) -> None:
+    key = str(user_id)
+    suggest_generations.set(key, suggest_generation(key) + 1)
+    suggest_cache.pop(key)
@@ -1,11 +1,13 @@
 from app.core.messages import ErrorMessages
-from app.schemas.user import UserParams
+from app.schemas.user import UserParams, UserResponse
 from fastapi.exceptions import HTTPException
 from app.models.user import User
 from app.services.base import BaseService
 from app.db.session import AsyncSession, get_session
 from fastapi import Depends, status
-from sqlalchemy import select, Select, or_, asc, desc, func
+from sqlalchemy import select, Select, or_
+from app.utils.export import ExportFormat, export_response
+from app.utils.pagination import KeysetPaginator
 from uuid import UUID
 
 
@@ -25,12 +27,6 @@ class UserService(BaseService):
             )
         return query
 
-    def _apply_sorting(self, query: Select, params: UserParams) -> Select:
-        sort_column = getattr(self.model, params.sort_by, "created_at")
-        order_by = asc(sort_column) if params.sort_order == "asc" else desc(sort_column)
-
-        return query.order_by(order_by)
-
     async def _find_user(self, user_id: UUID):
         result = await self.session.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
@@ -38,25 +34,18 @@ class UserService(BaseService):
     async def _find_users(self, params: UserParams):
         query = select(User)
         query = self._apply_filters(query, params)
-        query = self._apply_sorting(query, params)
-        count_query = select(func.count()).select_from(query.subquery())
 
-        result = await self.session.execute(query)
-        count_result = await self.session.execute(count_query)
+        # apply sorting and pagination
+        paginator = KeysetPaginator(self.model, params)
 
-        items = result.scalars().all()
-        count = count_result.scalar()
-        self.logger.info(f"Found {count} users returned {len(items)} users.")
+        items, next_cursor, count = await paginator.execute(self.session, query)
+        self.logger.info(
+            f"Found {count} ({params.count}) users returned {len(items)} users."
+        )
 
         return {
             "items": items,
-            "metadata": {
-                "pagination": {
-                    "page": params.page,
-                    "limit": params.limit,
-                    "total": count,
-                }
-            },
+            "metadata": {"pagination": paginator.metadata(count, next_cursor)},
         }
 
     async def get_user(self, user_id: UUID):
@@ -70,3 +59,9 @@ class UserService(BaseService):
 
     async def get_users(self, query_params: UserParams):
         return await self._find_users(query_params)
+
+    def export_users(self, format: ExportFormat):
+        table = User.__table__
+        query = select(*(table.c[field] for field in UserResponse.model_fields))
+        self.logger.info(f"Exporting users as {format}.")
+        return export_response(query, [table.c.created_at, table.c.id], format, "users")
@@ -0,0 +1,47 @@
+import hashlib
+import json
+from typing import Any, Iterable, Optional
+
+from fastapi.responses import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag whose opaque value is `parts` joined by dots."""
+    return 'W/"{}"'.format(".".join(str(part) for part in parts))
+
+
+def hash_etag(value: Any) -> str:
+    """Weak ETag over the JSON form of `value`, for composite representations."""
+    encoded = json.dumps(value, default=str, sort_keys=True, separators=(",", ":"))
+    return make_etag(hashlib.sha256(encoded.encode()).hexdigest()[:32])
+
+
+def _opaque_tags(header: str) -> Iterable[str]:
+    for tag in header.split(","):
+        tag = tag.strip()
+        yield tag.removeprefix("W/").strip('"')
+
+
+def etag_value(etag: str) -> str:
+    return etag.removeprefix("W/").strip('"')
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of `etag` against an If-None-Match/If-Match header.
+    Weak comparison is also used for If-Match, since a product version always
+    serializes to the same representation.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag_value(etag) in _opaque_tags(header)
+
+
+def if_match_values(header: str) -> list[str]:
+    return list(_opaque_tags(header))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
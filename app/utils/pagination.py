@@ -0,0 +1,323 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    and_,
+    func,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.config import settings
+from app.core.messages import ErrorMessages
+from app.db.session import async_engine, async_session
+from app.schemas.common import QueryParams
+from app.utils.cache import TTLCache
+
+
+# App-scoped cache of exact listing totals for `count=cached`, keyed by query.
+count_cache: TTLCache[str, int] = TTLCache(
+    settings.PAGINATION_COUNT_CACHE_SIZE,
+    ttl=settings.PAGINATION_COUNT_CACHE_TTL_SECONDS,
+)
+
+
+class ConnectionBudget:
+    """
+    Non-blocking cap on the extra pooled connections taken by parallel counts.
+
+    A slot is only granted while the pool has idle capacity below its
+    `pool_size`, so parallel counts never push requests into overflow
+    connections or make them wait on `pool_timeout`.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self.granted = 0
+        self.rejected = 0
+
+    def acquire(self) -> bool:
+        pool = async_engine.pool
+        if self.in_use >= self.limit or pool.checkedout() >= pool.size():  # type: ignore
+            self.rejected += 1
+            return False
+        self.in_use += 1
+        self.granted += 1
+        return True
+
+    def release(self) -> None:
+        self.in_use -= 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "limit": self.limit,
+            "in_use": self.in_use,
+            "granted": self.granted,
+            "rejected": self.rejected,
+        }
+
+
+# App-scoped budget of connections used by PAGINATION_COUNT_STRATEGY=parallel.
+parallel_count_budget = ConnectionBudget(
+    settings.PAGINATION_PARALLEL_COUNT_CONNECTIONS
+)
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON) <statement>`, keeping the statement's bind params."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class KeysetPaginator:
+    """
+    Paginates a query on the `(sort column, id)` pair.
+
+    Without a cursor the page is fetched with OFFSET (backward compatible);
+    with a cursor from a previous page, rows are fetched strictly after it, so
+    deep pages cost the same as the first one. NULLs of nullable columns
+    always sort last, non-null columns get a plain ASC/DESC that a backward
+    scan of their `(user_id, column, id)` index can serve.
+
+    `columns` are computed expressions selected next to the entity and set as
+    attributes on each returned item; `sort_by` may name one of them.
+    """
+
+    def __init__(
+        self,
+        model,
+        params: QueryParams,
+        columns: Optional[dict[str, ColumnElement]] = None,
+    ):
+        self.model = model
+        self.params = params
+        self.columns = columns or {}
+        if params.sort_by in self.columns:
+            self.column = self.sort_column = self.columns[params.sort_by]
+        else:
+            self.column = model.__table__.c[params.sort_by]
+            self.sort_column = getattr(model, params.sort_by)
+        self.descending = params.sort_order == "desc"
+        self.secret = (
+            settings.PAGINATION_CURSOR_SECRET or settings.VERIFICATION_TOKEN_SECRET
+        ).encode()
+
+    def _sign(self, body: str) -> str:
+        digest = hmac.new(self.secret, body.encode(), hashlib.sha256).digest()
+        return _b64encode(digest[:16])
+
+    def encode_cursor(self, item: Any) -> str:
+        value = getattr(item, self.params.sort_by)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+
+        body = _b64encode(
+            json.dumps(
+                [self.params.sort_by, self.params.sort_order, value, str(item.id)],
+                separators=(",", ":"),
+            ).encode()
+        )
+        return f"{body}.{self._sign(body)}"
+
+    def decode_cursor(self, cursor: str) -> tuple[Any, UUID]:
+        try:
+            body, signature = cursor.split(".")
+            if not hmac.compare_digest(signature, self._sign(body)):
+                raise ValueError("bad signature")
+
+            sort_by, sort_order, value, last_id = json.loads(_b64decode(body))
+            if (sort_by, sort_order) != (self.params.sort_by, self.params.sort_order):
+                raise ValueError("cursor was issued for a different sort")
+
+            if value is not None and self.column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            return value, UUID(last_id)
+        except (ValueError, TypeError, json.JSONDecodeError):
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST, ErrorMessages.INVALID_PAGINATION_CURSOR
+            )
+
+    def order_by(self) -> list[ColumnElement]:
+        if self.descending:
+            order = [self.sort_column.desc(), self.model.id.desc()]
+        else:
+            order = [self.sort_column.asc(), self.model.id.asc()]
+        if getattr(self.column, "nullable", False):
+            # matched by the ASC (default) and DESC NULLS LAST indexes.
+            order[0] = order[0].nulls_last()
+        return order
+
+    def _after(self, value: Any, last_id: UUID) -> ColumnElement[bool]:
+        id_column = self.model.id
+        if not getattr(self.column, "nullable", False):
+            # row comparison maps straight onto a (sort column, id) index range.
+            if self.descending:
+                return tuple_(self.sort_column, id_column) < tuple_(value, last_id)
+            return tuple_(self.sort_column, id_column) > tuple_(value, last_id)
+
+        after_id = id_column < last_id if self.descending else id_column > last_id
+        if value is None:
+            return and_(self.sort_column.is_(None), after_id)
+
+        after_value = (
+            self.sort_column < value if self.descending else self.sort_column > value
+        )
+        return or_(
+            after_value,
+            and_(self.sort_column == value, after_id),
+            self.sort_column.is_(None),
+        )
+
+    def apply(self, query: Select) -> Select:
+        query = query.add_columns(
+            *(column.label(name) for name, column in self.columns.items())
+        ).order_by(*self.order_by())
+        if self.params.cursor:
+            query = query.where(self._after(*self.decode_cursor(self.params.cursor)))
+        else:
+            query = query.offset(self.params.offset)
+
+        # one extra row tells whether there is a next page.
+        return query.limit(self.params.limit + 1)
+
+    async def count(self, session: AsyncSession, query: Select) -> Optional[int]:
+        """
+        Total rows matched by the filtered (unsorted, unpaginated) `query`,
+        computed according to `params.count`:
+
+        - `exact`: `count(*)` over the filtered query.
+        - `none`: skipped, the total is reported as null.
+        - `cached`: exact count reused for `PAGINATION_COUNT_CACHE_TTL_SECONDS`.
+        - `estimate`: the planner's row estimate from `EXPLAIN`, no rows are read.
+        """
+        mode = self.params.count
+        if mode == "none":
+            return None
+
+        if mode == "estimate":
+            result = await session.execute(Explain(query))
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+        key = None
+        if mode == "cached" and count_cache.enabled:
+            compiled = query.compile()
+            key = hashlib.sha256(
+                f"{compiled}:{sorted(compiled.params.items())!r}".encode()
+            ).hexdigest()
+            total = count_cache.get(key)
+            if total is not None:
+                return total
+
+        result = await session.execute(
+            select(func.count()).select_from(query.subquery())
+        )
+        total = result.scalar_one()
+        if key is not None:
+            count_cache.set(key, total)
+        return total
+
+    async def execute(
+        self, session: AsyncSession, query: Select
+    ) -> tuple[list[Any], Optional[str], Optional[int]]:
+        """
+        Fetch the page and the total of the filtered `query`, returning
+        `(items, next_cursor, total)`. How the count query runs is set by
+        `PAGINATION_COUNT_STRATEGY`:
+
+        - `sequential`: after the data query, on the same session.
+        - `parallel`: concurrently, on a second pooled connection when
+          `parallel_count_budget` grants one (sequential otherwise).
+        - `window`: folded into the data query as `count(*) OVER ()` for
+          exact counts of offset pages.
+        """
+        strategy = settings.PAGINATION_COUNT_STRATEGY
+
+        if (
+            strategy == "window"
+            and self.params.count == "exact"
+            and not self.params.cursor
+        ):
+            result = await session.execute(
+                self.apply(query.add_columns(func.count().over().label("total")))
+            )
+            rows = result.all()
+            # past the last page no row carries the total, count separately.
+            if rows or self.params.offset == 0:
+                items, next_cursor = self.paginate(self._items(rows))
+                return items, next_cursor, rows[0].total if rows else 0
+
+        elif (
+            strategy == "parallel"
+            and self.params.count != "none"
+            and parallel_count_budget.acquire()
+        ):
+            try:
+                async with async_session() as count_session:
+                    result, total = await asyncio.gather(
+                        session.execute(self.apply(query)),
+                        self.count(count_session, query),
+                    )
+            finally:
+                parallel_count_budget.release()
+            items, next_cursor = self.paginate(self._items(result.all()))
+            return items, next_cursor, total
+
+        result = await session.execute(self.apply(query))
+        items, next_cursor = self.paginate(self._items(result.all()))
+        return items, next_cursor, await self.count(session, query)
+
+    def _items(self, rows: Sequence[Row]) -> list[Any]:
+        for row in rows:
+            for name in self.columns:
+                setattr(row[0], name, row._mapping[name])
+        return [row[0] for row in rows]
+
+    def metadata(self, total: Optional[int], next_cursor: Optional[str]) -> dict:
+        return {
+            "page": self.params.page,
+            "limit": self.params.limit,
+            "total": total,
+            "count_mode": self.params.count,
+            "next_cursor": next_cursor,
+        }
+
+    def paginate(self, rows: Sequence[Any]) -> tuple[list[Any], Optional[str]]:
+        items = list(rows[: self.params.limit])
+        next_cursor = None
+        if len(rows) > self.params.limit and items:
+            next_cursor = self.encode_cursor(items[-1])
+        return items, next_cursor
@@ -1,14 +1,55 @@
+from typing import Callable, Optional
+
 from fastapi import APIRouter
 
+from app.core.config import settings
 from app.handlers.response import response_handler
 
 
+def coalesce(max_waiters: Optional[int] = None) -> Callable:
+    """
+    Opt a GET route into single-flight coalescing, identical concurrent
+    requests of a principal then share one call of the endpoint.
+    `max_waiters` caps the requests sharing a call (SINGLE_FLIGHT_MAX_WAITERS).
+    """
+
+    def decorator(endpoint: Callable):
+        endpoint.coalesce_max_waiters = (  # type: ignore
+            max_waiters or settings.SINGLE_FLIGHT_MAX_WAITERS
+        )
+        return endpoint
+
+    return decorator
+
+
+def idempotent(endpoint: Callable) -> Callable:
+    """
+    Opt a POST route into Idempotency-Key replays, retries sending the key of
+    a caller's earlier request get its stored response. Only for routes whose
+    body is a model, the stored fingerprint doesn't cover raw bodies.
+    """
+    endpoint.idempotent = True  # type: ignore
+    return endpoint
+
+
 class AutoAPIResponseRouter(APIRouter):
     def add_api_route(self, path: str, endpoint, **kwargs):
         # Force response_model_exclude_unset for this CustomRouter
         kwargs.setdefault("response_model_exclude_none", True)
 
+        max_waiters = getattr(endpoint, "coalesce_max_waiters", None)
+        if max_waiters and set(kwargs.get("methods") or ()) - {"GET", "HEAD"}:
+            raise ValueError(f"Only GET routes can be coalesced, got {path!r}")
+
+        is_idempotent = getattr(endpoint, "idempotent", False)
+        if is_idempotent and set(kwargs.get("methods") or ()) != {"POST"}:
+            raise ValueError(f"Only POST routes can be idempotent, got {path!r}")
+
         # apply @response_handler decorater
-        endpoint = response_handler()(endpoint)
+        endpoint = response_handler(
+            coalesce=max_waiters is not None,
+            max_waiters=max_waiters,
+            idempotent=is_idempotent,
+        )(endpoint)
 
         return super().add_api_route(path, endpoint, **kwargs)
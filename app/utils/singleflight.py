@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class FlightAbandoned(Exception):
+    """The caller running a flight was cancelled before it landed."""
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "abandoned", "waiters")
+
+    def __init__(self):
+        self.done = asyncio.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.abandoned = False
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key into a single execution.
+
+    The first caller runs the call, callers arriving while it is in flight
+    wait for it and share its result or exception. Once `max_waiters` callers
+    share a flight, the next one starts a fresh flight for later arrivals.
+    If the caller running a flight is cancelled, the first waiter to resume
+    starts a new one and the other waiters share it, or with `take_over=False`
+    every waiter raises `FlightAbandoned`.
+    Nothing is kept once a flight lands, so this is not a cache.
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.shared = 0
+        self.overflows = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        max_waiters: Optional[int] = None,
+        take_over: bool = True,
+    ) -> Any:
+        flight = self._flights.get(key)
+        if flight is not None:
+            if max_waiters is None or flight.waiters < max_waiters:
+                return await self._wait(key, flight, fn, max_waiters, take_over)
+            self.overflows += 1
+
+        flight = _Flight()
+        self._flights[key] = flight
+        self.calls += 1
+        try:
+            flight.result = await fn()
+            return flight.result
+        except asyncio.CancelledError:
+            # the caller went away, one of the waiters takes the call over.
+            flight.abandoned = True
+            raise
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            flight.done.set()
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    async def _wait(
+        self,
+        key: Hashable,
+        flight: _Flight,
+        fn: Callable[[], Awaitable[Any]],
+        max_waiters: Optional[int],
+        take_over: bool,
+    ) -> Any:
+        flight.waiters += 1
+        await flight.done.wait()
+        if flight.abandoned:
+            if not take_over:
+                raise FlightAbandoned
+            # the abandoned flight is gone, the first waiter starts the next
+            # one before the others resume and join it.
+            return await self.do(key, fn, max_waiters, take_over)
+
+        self.shared += 1
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self),
+            "calls": self.calls,
+            "shared": self.shared,
+            "overflows": self.overflows,
+        }
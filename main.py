@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from app.core.config import settings
 from fastapi import FastAPI
 from app.core.slowapi import limiter
@@ -10,6 +12,9 @@ from app.handlers.middlewares import RequestIDMiddleware, RequestDurationMiddlew
 # import routers
 from app.api.endpoints import router as api_router
 
+# import background jobs
+from app.services.reaper import reaper
+
 # import exception handlers
 from app.handlers.exception import (
     http_exception_handler,
@@ -26,12 +31,29 @@ from app.core.logger import configure_logging
 configure_logging()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    reaper_task = None
+    if settings.REAPER_ENABLED:
+        reaper_task = asyncio.create_task(
+            reaper.run_forever(settings.REAPER_INTERVAL_SECONDS)
+        )
+
+    yield
+
+    if reaper_task:
+        reaper_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await reaper_task
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.PROJECT_NAME,
     version=settings.VERSION,
     docs_url=settings.API_V1_PREFIX + "/docs",
     redoc_url=settings.API_V1_PREFIX + "/redoc",
+    lifespan=lifespan,
 )
 app.state.limiter = limiter
 
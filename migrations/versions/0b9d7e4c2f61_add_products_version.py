@@ -0,0 +1,32 @@
+"""add products version
+
+Revision ID: 0b9d7e4c2f61
+Revises: f1a6c8e2b950
+Create Date: 2026-10-17 16:48:03.551207
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0b9d7e4c2f61"
+down_revision: Union[str, Sequence[str], None] = "f1a6c8e2b950"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "products",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("products", "version")
@@ -0,0 +1,36 @@
+"""add products updated_at desc index
+
+Revision ID: 5d2a8f6b1c93
+Revises: 0b9d7e4c2f61
+Create Date: 2026-10-17 18:12:40.318220
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2a8f6b1c93"
+down_revision: Union[str, Sequence[str], None] = "0b9d7e4c2f61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # updated_at is nullable and sorted NULLS LAST both ways, a backward scan of
+    # the default (user_id, updated_at, id) index only yields DESC NULLS FIRST.
+    op.create_index(
+        "ix_products_user_id_updated_at_desc_id",
+        "products",
+        ["user_id", sa.text("updated_at DESC NULLS LAST"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_products_user_id_updated_at_desc_id", table_name="products")
@@ -0,0 +1,43 @@
+"""add users keyset pagination indexes
+
+Revision ID: 8e3f1b7d4a52
+Revises: 5d2a8f6b1c93
+Create Date: 2026-10-17 20:41:07.512836
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e3f1b7d4a52"
+down_revision: Union[str, Sequence[str], None] = "5d2a8f6b1c93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SORT_COLUMNS = ["created_at", "updated_at", "name", "email"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in SORT_COLUMNS:
+        op.create_index(
+            f"ix_users_{column}_id", "users", [column, "id"], unique=False
+        )
+    # updated_at is nullable and sorted NULLS LAST both ways.
+    op.create_index(
+        "ix_users_updated_at_desc_id",
+        "users",
+        [sa.text("updated_at DESC NULLS LAST"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_users_updated_at_desc_id", table_name="users")
+    for column in SORT_COLUMNS:
+        op.drop_index(f"ix_users_{column}_id", table_name="users")
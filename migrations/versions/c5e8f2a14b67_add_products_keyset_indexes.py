@@ -0,0 +1,37 @@
+"""add products keyset pagination indexes
+
+Revision ID: c5e8f2a14b67
+Revises: a3c91e5d7f20
+Create Date: 2026-10-17 10:03:18.204915
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e8f2a14b67"
+down_revision: Union[str, Sequence[str], None] = "a3c91e5d7f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SORT_COLUMNS = ["created_at", "updated_at", "name", "price", "stock"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in SORT_COLUMNS:
+        op.create_index(
+            f"ix_products_user_id_{column}_id",
+            "products",
+            ["user_id", column, "id"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in SORT_COLUMNS:
+        op.drop_index(f"ix_products_user_id_{column}_id", table_name="products")
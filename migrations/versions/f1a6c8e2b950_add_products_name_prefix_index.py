@@ -0,0 +1,32 @@
+"""add products name prefix index
+
+Revision ID: f1a6c8e2b950
+Revises: e7b4d19c03a8
+Create Date: 2026-10-17 14:05:27.918342
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1a6c8e2b950"
+down_revision: Union[str, Sequence[str], None] = "e7b4d19c03a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # text_pattern_ops serves `lower(name) LIKE 'prefix%'` under any collation.
+    op.execute(
+        "CREATE INDEX ix_products_user_id_lower_name "
+        "ON products (user_id, lower(name) text_pattern_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_products_user_id_lower_name", table_name="products")
@@ -15,6 +15,7 @@ from alembic import command
 from alembic.config import Config
 
 from main import app
+from app.core.slowapi import limiter
 from app.db.session import get_session
 
 # Global variables to hold engine and session factory
@@ -111,6 +112,13 @@ async def override_get_session() -> AsyncGenerator[AsyncSession]:
 app.dependency_overrides[get_session] = override_get_session
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def reset_rate_limits():
+    # every test starts with a fresh rate-limit budget
+    limiter.reset()
+    yield
+
+
 @pytest_asyncio.fixture
 async def client():
     BASE_URL = "http://test"
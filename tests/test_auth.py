@@ -1,7 +1,16 @@
+import asyncio
+import ecdsa
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient, Response
+from jose import jwk
+from uuid import uuid4
 
+from app.core.config import settings
+from app.core.messages import ErrorMessages
 from app.schemas.auth import AuthResponse, SignupRequest, LoginRequest
+from app.services.auth.jwt import JwtService, verified_token_cache
+from app.services.auth.keys import KeyRing, SigningKey
 
 
 user_credentials = {"name": "Uttam", "email": "mail@uttam.com", "password": "Pass!123"}
@@ -41,6 +50,54 @@ async def test_failed_signup(client: AsyncClient):
     assert res_json["error"]["message"] == "User already exists"
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_idempotent_signup(client: AsyncClient):
+    credentials = {
+        "name": "Retry User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    headers = {"Idempotency-Key": uuid4().hex}
+
+    # concurrent and later retries replay the first signup
+    responses = await asyncio.gather(
+        client.post("/auth/signup", json=credentials, headers=headers),
+        client.post("/auth/signup", json=credentials, headers=headers),
+    )
+    responses.append(
+        await client.post("/auth/signup", json=credentials, headers=headers)
+    )
+    assert [res.status_code for res in responses] == [200] * 3
+    tokens = {res.json()["data"]["tokens"]["access_token"] for res in responses}
+    assert len(tokens) == 1
+    assert [res.headers.get("idempotent-replayed") for res in responses].count(
+        "true"
+    ) == 2
+
+    # the key can't be reused for a different request
+    res = await client.post(
+        "/auth/signup",
+        json={**credentials, "email": f"test_{uuid4()}@example.com"},
+        headers=headers,
+    )
+    assert res.status_code == 422
+    assert res.json()["error"]["message"] == ErrorMessages.IDEMPOTENCY_KEY_REUSED
+
+    # token issuing routes ignore the key, tokens are never stored for replays
+    responses = [
+        await client.post(
+            "/auth/login",
+            json={"email": credentials["email"], "password": credentials["password"]},
+            headers=headers,
+        )
+        for _ in range(2)
+    ]
+    assert [res.status_code for res in responses] == [200] * 2
+    assert "idempotent-replayed" not in responses[1].headers
+    tokens = {res.json()["data"]["tokens"]["refresh_token"] for res in responses}
+    assert len(tokens) == 2
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_success_login(client: AsyncClient):
     res = await client.post(
@@ -82,6 +139,32 @@ async def test_success_access_token(client: AsyncClient):
     assert res_json["data"]["id"]
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_verified_token_cache_hit(client: AsyncClient):
+    global auth_tokens
+    headers = {"Authorization": f"Bearer {auth_tokens.tokens.access_token}"}
+
+    await client.get("/auth/me", headers=headers)
+    hits = verified_token_cache.hits
+    res = await client.get("/auth/me", headers=headers)
+
+    assert res.status_code == 200
+    assert verified_token_cache.hits == hits + 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_update_invalidates_cached_user(client: AsyncClient):
+    global auth_tokens
+    headers = {"Authorization": f"Bearer {auth_tokens.tokens.access_token}"}
+
+    res = await client.patch("/auth/update", json={"name": "Uttam K"}, headers=headers)
+    assert res.status_code == 200
+
+    res = await client.get("/auth/me", headers=headers)
+    assert res.status_code == 200
+    assert res.json()["data"]["name"] == "Uttam K"
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_success_refresh_token(client: AsyncClient):
     global auth_tokens
@@ -127,3 +210,102 @@ async def test_failed_refresh_token(client: AsyncClient):
 
     assert res_json != {}
     assert not res_json["success"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_active_sessions_are_capped(client: AsyncClient):
+    credentials = {"email": "sessions@uttam.com", "password": "Pass!123"}
+    await client.post("/auth/signup", json={"name": "Sessions", **credentials})
+
+    for device in range(settings.MAX_ACTIVE_SESSIONS + 2):
+        res = await client.post(
+            "/auth/login",
+            json=credentials,
+            headers={"User-Agent": f"device-{device}"},
+        )
+        assert res.status_code == 200
+
+    access_token = res.json()["data"]["tokens"]["access_token"]
+    res = await client.get(
+        "/auth/sessions", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert res.status_code == 200
+    assert len(res.json()["data"]) == settings.MAX_ACTIVE_SESSIONS
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_revoke_all_sessions(client: AsyncClient):
+    credentials = {"email": "revoke-all@uttam.com", "password": "Pass!123"}
+    res = await client.post("/auth/signup", json={"name": "Revoke", **credentials})
+    tokens = res.json()["data"]["tokens"]
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    res = await client.post("/auth/sessions/revoke-all", headers=headers)
+    assert res.status_code == 200
+
+    # the access token stops working immediately, not at expiry
+    res = await client.get("/auth/me", headers=headers)
+    assert res.status_code == 401
+
+    res = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_revoke_session_keeps_other_devices(client: AsyncClient):
+    credentials = {"email": f"test_{uuid4()}@example.com", "password": "Pass!123"}
+    await client.post("/auth/signup", json={"name": "Revoke One", **credentials})
+
+    devices = []
+    for device in range(2):
+        res = await client.post(
+            "/auth/login", json=credentials, headers={"User-Agent": f"device-{device}"}
+        )
+        devices.append(res.json()["data"]["tokens"])
+
+    res = await client.post(
+        "/auth/logout",
+        json={"refresh_token": devices[0]["refresh_token"]},
+        headers={"Authorization": f"Bearer {devices[0]['access_token']}"},
+    )
+    assert res.status_code == 200
+
+    # only the logged out session ends, the other device stays signed in
+    res = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {devices[1]['access_token']}"}
+    )
+    assert res.status_code == 200
+    res = await client.post(
+        "/auth/refresh", json={"refresh_token": devices[0]["refresh_token"]}
+    )
+    assert res.status_code == 401
+    res = await client.post(
+        "/auth/refresh", json={"refresh_token": devices[1]["refresh_token"]}
+    )
+    assert res.status_code == 200
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_jwks(client: AsyncClient):
+    res = await client.get("/.well-known/jwks.json")
+    assert res.status_code == 200
+    assert res.json() == {"keys": []}
+    assert res.headers["Cache-Control"].startswith("public")
+
+
+def test_key_ring_signing():
+    private_pem = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p).to_pem().decode()
+    private_key = jwk.construct(private_pem, "ES256")
+    signing_key = SigningKey("k1", "ES256", private_key.public_key(), private_key)
+    jwt_service = JwtService("access", "", "ES256", 15, key_ring=KeyRing([signing_key]))
+
+    token = jwt_service.encode_token({"sub": "user-id", "email": "a@b.com"})
+    assert jwt_service.decode_token(token).sub == "user-id"
+
+    # tokens signed with a kid that left the ring are rejected
+    rotated_key = SigningKey("k2", "ES256", private_key.public_key(), private_key)
+    jwt_service.key_ring = KeyRing([rotated_key])
+    with pytest.raises(HTTPException):
+        jwt_service.decode_token(token)
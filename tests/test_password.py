@@ -0,0 +1,73 @@
+import asyncio
+import time
+from uuid import uuid4
+
+import pytest
+from argon2 import PasswordHasher
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from app.db.session import async_session
+from app.models.user import User
+from app.services.auth.password import PasswordHashPool, PasswordService
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_password_pool_rejects_when_queue_is_full():
+    pool = PasswordHashPool(max_workers=1, max_waiting=0, wait_timeout=1)
+
+    running = asyncio.create_task(pool.run(time.sleep, 0.2))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(time.sleep, 0)
+    assert exc_info.value.status_code == 503
+
+    await running
+    stats = pool.stats()
+    assert stats["completed"] == 1
+    assert stats["rejected"] == 1
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_password_pool_rejects_after_wait_timeout():
+    pool = PasswordHashPool(max_workers=1, max_waiting=1, wait_timeout=0.05)
+
+    running = asyncio.create_task(pool.run(time.sleep, 0.2))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(time.sleep, 0)
+    assert exc_info.value.status_code == 503
+    await running
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_login_rehashes_outdated_password(client: AsyncClient):
+    credentials = {"email": f"test_{uuid4()}@example.com", "password": "Pass!123"}
+    await client.post("/auth/signup", json={"name": "Rehash User", **credentials})
+
+    # simulate a hash created with older, cheaper parameters
+    weak_hash = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1).hash(
+        credentials["password"]
+    )
+    async with async_session() as session:
+        await session.execute(
+            update(User)
+            .where(User.email == credentials["email"])
+            .values(password_hash=weak_hash)
+        )
+        await session.commit()
+
+    res = await client.post("/auth/login", json=credentials)
+    assert res.status_code == 200
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(User.password_hash).where(User.email == credentials["email"])
+        )
+        password_hash = result.scalar_one()
+    assert password_hash != weak_hash
+    assert not PasswordService().needs_rehash(password_hash)
@@ -1,6 +1,40 @@
+import asyncio
+import csv
+import io
+import json
 import pytest
 from httpx import AsyncClient
 from uuid import uuid4
+from jose import jwt
+from pydantic import ValidationError
+from sqlalchemy import select, text, update
+
+from app.core.config import settings
+from app.core.messages import ErrorMessages
+from app.core.slowapi import limiter
+from app.db.session import async_session
+from app.models.product import Product
+from app.models.user import User, UserRole
+from app.schemas.product import ProductParams
+from app.schemas.user import UserParams
+from app.services.auth.user_cache import user_cache
+from app.handlers.response import _idempotent_call, request_flights
+from app.services.product import ProductService
+from app.services.product_cache import (
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    product_cache,
+)
+from app.services.product_import import ProductImporter
+from app.services.suggest import (
+    PrefixIndex,
+    invalidate_suggestions,
+    store_suggestions,
+    suggest_cache,
+    suggest_generation,
+)
+from app.utils.pagination import Explain, KeysetPaginator
+from app.utils.singleflight import SingleFlight
 
 
 @pytest.mark.asyncio(loop_scope="session")
@@ -74,6 +108,632 @@ async def test_get_products(client: AsyncClient):
     assert len(res_json["data"]) >= 1
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_count_modes(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    product_data = {
+        "name": "Test Product",
+        "description": "This is a test product description with enough length.",
+        "price": 100.0,
+        "stock": 10,
+    }
+    for _ in range(2):
+        await client.post("/products", json=product_data, headers=headers)
+
+    async def get_pagination(count: str) -> dict:
+        res = await client.get("/products", params={"count": count}, headers=headers)
+        assert res.status_code == 200
+        return res.json()["meta"]["pagination"]
+
+    pagination = await get_pagination("exact")
+    assert (pagination["total"], pagination["count_mode"]) == (2, "exact")
+
+    pagination = await get_pagination("none")
+    assert pagination["count_mode"] == "none"
+    assert pagination["total"] is None
+
+    # cached totals are reused until their TTL expires
+    assert (await get_pagination("cached"))["total"] == 2
+    await client.post("/products", json=product_data, headers=headers)
+    assert (await get_pagination("cached"))["total"] == 2
+
+    pagination = await get_pagination("estimate")
+    assert pagination["count_mode"] == "estimate"
+    assert pagination["total"] >= 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("strategy", ["parallel", "window"])
+async def test_get_products_count_strategies(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch, strategy: str
+):
+    monkeypatch.setattr(settings, "PAGINATION_COUNT_STRATEGY", strategy)
+
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    product_data = {
+        "name": "Test Product",
+        "description": "This is a test product description with enough length.",
+        "price": 100.0,
+        "stock": 10,
+    }
+    for _ in range(3):
+        await client.post("/products", json=product_data, headers=headers)
+
+    # totals match whichever page is requested, including past the last one
+    for page, returned in [(1, 2), (2, 1), (3, 0)]:
+        res = await client.get(
+            "/products", params={"limit": 2, "page": page}, headers=headers
+        )
+        assert res.status_code == 200
+        res_json = res.json()
+        assert len(res_json["data"]) == returned
+        assert res_json["meta"]["pagination"]["total"] == 3
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_search_products(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    for name, description in [
+        ("Office Chair", "Ergonomic chair with a mechanical keyboard tray."),
+        ("Mechanical Keyboard", "Hot-swappable mechanical keyboard with RGB."),
+        ("Gaming Mouse", "Lightweight wireless mouse for competitive games."),
+    ]:
+        await client.post(
+            "/products",
+            json={"name": name, "description": description, "price": 50, "stock": 5},
+            headers=headers,
+        )
+
+    # stemmed matches, name hits rank above description hits
+    res = await client.get(
+        "/products",
+        params={"query": "keyboards", "sort_by": "relevance"},
+        headers=headers,
+    )
+    assert res.status_code == 200
+    products = res.json()["data"]
+    assert [product["name"] for product in products] == [
+        "Mechanical Keyboard",
+        "Office Chair",
+    ]
+    assert products[0]["relevance"] > products[1]["relevance"]
+    assert "<mark>keyboard</mark>" in products[0]["snippet"]
+
+    # relevance pages can be walked with cursors
+    params = {"query": "keyboard", "sort_by": "relevance", "limit": 1}
+    res = await client.get("/products", params=params, headers=headers)
+    cursor = res.json()["meta"]["pagination"]["next_cursor"]
+    res = await client.get(
+        "/products", params={**params, "cursor": cursor}, headers=headers
+    )
+    assert [product["name"] for product in res.json()["data"]] == ["Office Chair"]
+
+    res = await client.get(
+        "/products", params={"sort_by": "relevance"}, headers=headers
+    )
+    assert res.status_code == 400
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_suggest_products(client: AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    async def create_product(name: str):
+        await client.post(
+            "/products",
+            json={
+                "name": name,
+                "description": "This is a test product description with enough length.",
+                "price": 10,
+                "stock": 1,
+            },
+            headers=headers,
+        )
+
+    async def suggest(prefix: str) -> list[str]:
+        res = await client.get(
+            "/products/suggest", params={"prefix": prefix}, headers=headers
+        )
+        assert res.status_code == 200
+        return res.json()["data"]
+
+    for name in ["Keyboard Pro", "keyboard mini", "Mouse_Pad"]:
+        await create_product(name)
+
+    assert await suggest("KEY") == ["keyboard mini", "Keyboard Pro"]
+    assert await suggest("mouse_") == ["Mouse_Pad"]
+
+    # writes invalidate the warmed index
+    await create_product("Keycap Set")
+    assert await suggest("key") == ["keyboard mini", "Keyboard Pro", "Keycap Set"]
+
+    # large catalogs are served by the database with the same results
+    monkeypatch.setattr(settings, "SUGGEST_INDEX_MAX_NAMES", 1)
+    await create_product("Monitor")
+    assert await suggest("key") == ["keyboard mini", "Keyboard Pro", "Keycap Set"]
+    assert await suggest("mouse_") == ["Mouse_Pad"]
+    assert await suggest("mouse%") == []
+
+
+def test_suggest_index_built_during_write_is_dropped():
+    user_id = uuid4()
+    generation = suggest_generation(user_id)
+
+    # a write lands while the index is loaded, the stale index isn't cached
+    invalidate_suggestions(user_id)
+    store_suggestions(user_id, PrefixIndex(["Stale"]), generation)
+    assert suggest_cache.get(str(user_id)) is None
+
+    store_suggestions(user_id, PrefixIndex(["Fresh"]), suggest_generation(user_id))
+    assert suggest_cache.get(str(user_id)) is not None
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_filters_and_facets(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    for price, stock in [(5, 0), (20, 3), (80, 50), (700, 10)]:
+        await client.post(
+            "/products",
+            json={
+                "name": f"Product {price}",
+                "description": "This is a test product description with enough length.",
+                "price": price,
+                "stock": stock,
+            },
+            headers=headers,
+        )
+    # setup and listing share the per-route rate limit
+    limiter.reset()
+
+    async def get_prices(**params) -> list[float]:
+        res = await client.get(
+            "/products", params={"sort_by": "price", "sort_order": "asc", **params},
+            headers=headers,
+        )
+        assert res.status_code == 200
+        return [product["price"] for product in res.json()["data"]]
+
+    assert await get_prices(min_price=10, max_price=100) == [20, 80]
+    assert await get_prices(in_stock=True) == [20, 80, 700]
+    assert await get_prices(in_stock=False) == [5]
+    assert await get_prices(low_stock=True) == [20]
+    assert await get_prices(created_after="2000-01-01T00:00:00Z") == [5, 20, 80, 700]
+    assert await get_prices(created_before="2000-01-01T00:00:00Z") == []
+
+    res = await client.get(
+        "/products", params={"facets": True, "min_price": 10}, headers=headers
+    )
+    facets = res.json()["meta"]["facets"]
+    assert [bucket["count"] for bucket in facets["price"]] == [0, 1, 1, 0, 1, 0, 0]
+    assert facets["price"][0] == {"min": None, "max": 10, "count": 0}
+    assert facets["stock"] == {"in_stock": 3, "low_stock": 1, "out_of_stock": 0}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_bulk_create_products(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    product_data = {
+        "description": "This is a test product description with enough length.",
+        "price": 10,
+        "stock": 1,
+    }
+    items = [
+        {"name": "Bulk Product 1", **product_data},
+        {"name": "X", **product_data},
+        {"name": "Bulk Product 2", **product_data},
+    ]
+    res = await client.post("/products/bulk", json={"items": items}, headers=headers)
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert [product["name"] for product in data["created"]] == [
+        "Bulk Product 1",
+        "Bulk Product 2",
+    ]
+    assert data["errors"][0]["index"] == 1
+    assert data["errors"][0]["details"][0]["field"] == "name"
+
+    res = await client.get("/products", headers=headers)
+    assert res.json()["meta"]["pagination"]["total"] == 2
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_bulk_update_products(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    product_data = {
+        "description": "This is a test product description with enough length.",
+        "price": 10,
+        "stock": 5,
+    }
+    res = await client.post(
+        "/products/bulk",
+        json={"items": [{"name": f"Product {i}", **product_data} for i in range(2)]},
+        headers=headers,
+    )
+    first, second = res.json()["data"]["created"]
+
+    items = [
+        {"id": first["id"], "stock": 0},
+        {"id": second["id"], "name": "Renamed", "price": 25},
+        {"id": str(uuid4()), "stock": 1},
+    ]
+    res = await client.patch("/products/bulk", json={"items": items}, headers=headers)
+    assert res.status_code == 200
+    data = res.json()["data"]
+    updated = {product["id"]: product for product in data["updated"]}
+    assert updated[first["id"]]["stock"] == 0
+    assert updated[first["id"]]["price"] == 10
+    assert (updated[second["id"]]["name"], updated[second["id"]]["price"]) == (
+        "Renamed",
+        25,
+    )
+    assert updated[second["id"]]["updated_at"] is not None
+    assert [error["index"] for error in data["errors"]] == [2]
+
+    res = await client.patch(
+        "/products/bulk", json={"items": [items[0], items[0]]}, headers=headers
+    )
+    assert res.status_code == 422
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_import_products(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    description = "This is a test product description with enough length."
+    csv_body = (
+        "name,description,price,stock\r\n"
+        f"Imported One,{description},10,1\r\n"
+        f'Imported Two,"Multi-line, quoted\n{description}",20,2\r\n'
+        f"X,{description},30,3\r\n"
+    )
+    res = await client.post(
+        "/products/import",
+        content=csv_body.encode(),
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert (data["status"], data["accepted"], data["rejected"]) == ("completed", 2, 1)
+    assert data["errors"][0]["index"] == 2
+
+    product = {"name": "Imported Three", "description": description, "price": 5}
+    ndjson_body = "\n".join([json.dumps({**product, "stock": 1}), "not json"])
+    res = await client.post(
+        "/products/import",
+        params={"format": "ndjson", "background": True},
+        content=ndjson_body.encode(),
+        headers=headers,
+    )
+    job_id = res.json()["data"]["job_id"]
+
+    res = await client.get(f"/products/import/{job_id}", headers=headers)
+    data = res.json()["data"]
+    assert (data["status"], data["accepted"], data["rejected"]) == ("completed", 1, 1)
+
+    res = await client.get("/products", params={"query": "imported"}, headers=headers)
+    assert res.json()["meta"]["pagination"]["total"] == 3
+
+    res = await client.post(
+        "/products/import",
+        content=b"{}",
+        headers={**headers, "Content-Type": "application/json"},
+    )
+    assert res.status_code == 415
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_import_rejects_bad_csv_records(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "text/csv"}
+
+    # an unclosed quote is dropped once it spans the record limit, 2 rows here,
+    # instead of swallowing the rest of the file
+    monkeypatch.setattr(settings, "PRODUCT_IMPORT_MAX_RECORD_LENGTH", 200)
+    description = "This is a test product description with enough length."
+    csv_body = (
+        "name,description,price,stock\r\n"
+        f'27" Monitor,{description},10,1\r\n'
+        f'"Unclosed,{description},20,2\r\n'
+        + f"Following,{description},30,3\r\n" * 5
+        + f"Last Monitor,{description},40,4\r\n"
+    )
+    res = await client.post(
+        "/products/import", content=csv_body.encode(), headers=headers
+    )
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert (data["accepted"], data["rejected"]) == (5, 1)
+    assert data["errors"][0]["index"] == 1
+    assert data["errors"][0]["details"][0]["message"] == (
+        ErrorMessages.IMPORT_RECORD_TOO_LONG
+    )
+
+    res = await client.get("/products", headers=headers)
+    names = {product["name"] for product in res.json()["data"]}
+    assert names == {'27" Monitor', "Following", "Last Monitor"}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_import_ignores_idempotency_key(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "text/csv",
+        "Idempotency-Key": uuid4().hex,
+    }
+
+    # a reused key with another file imports it instead of replaying the first
+    description = "This is a test product description with enough length."
+    for name in ["First Import", "Second Import"]:
+        res = await client.post(
+            "/products/import",
+            content=f"name,description,price,stock\r\n{name},{description},10,1\r\n",
+            headers=headers,
+        )
+        assert res.status_code == 200
+        assert res.json()["data"]["accepted"] == 1
+        assert "idempotent-replayed" not in res.headers
+
+    res = await client.get("/products", headers=headers)
+    names = {product["name"] for product in res.json()["data"]}
+    assert names == {"First Import", "Second Import"}
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_failed_import_accepts_nothing(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    # the first chunk is copied, the second one fails and rolls everything back
+    monkeypatch.setattr(settings, "PRODUCT_IMPORT_CHUNK_SIZE", 1)
+    copy = ProductImporter._copy
+
+    async def failing_copy(self, records):
+        if self.copied:
+            raise RuntimeError("copy failed")
+        await copy(self, records)
+
+    monkeypatch.setattr(ProductImporter, "_copy", failing_copy)
+
+    product = {
+        "description": "This is a test product description with enough length.",
+        "price": 5,
+        "stock": 1,
+    }
+    ndjson_body = "\n".join(
+        json.dumps({**product, "name": name}) for name in ["Failed One", "Failed Two"]
+    )
+    res = await client.post(
+        "/products/import",
+        params={"format": "ndjson", "background": True},
+        content=ndjson_body.encode(),
+        headers=headers,
+    )
+    job_id = res.json()["data"]["job_id"]
+
+    res = await client.get(f"/products/import/{job_id}", headers=headers)
+    data = res.json()["data"]
+    assert (data["status"], data["accepted"]) == ("failed", 0)
+
+    res = await client.get("/products", headers=headers)
+    assert res.json()["meta"]["pagination"]["total"] == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_export_products(client: AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    # export in several batches
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    product_data = {
+        "description": "This is a test product description, with a comma.",
+        "price": 10,
+        "stock": 1,
+    }
+    await client.post(
+        "/products/bulk",
+        json={"items": [{"name": f"Product {i}", **product_data} for i in range(3)]},
+        headers=headers,
+    )
+
+    res = await client.get("/products/export", headers=headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+    products = [json.loads(line) for line in res.text.splitlines()]
+    assert sorted(product["name"] for product in products) == [
+        "Product 0",
+        "Product 1",
+        "Product 2",
+    ]
+    assert products[0]["description"] == product_data["description"]
+
+    res = await client.get(
+        "/products/export", params={"format": "csv"}, headers=headers
+    )
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert len(rows) == 3
+    assert rows[0]["description"] == product_data["description"]
+    assert "attachment" in res.headers["content-disposition"]
+
+    # the user export is admin only
+    res = await client.get("/users/export", headers=headers)
+    assert res.status_code == 403
+
+    async with async_session() as session:
+        await session.execute(
+            update(User)
+            .where(User.email == user_credentials["email"])
+            .values(role=UserRole.ADMIN)
+        )
+        await session.commit()
+    user_cache.clear()
+    login_res = await client.post(
+        "/auth/login",
+        json={
+            "email": user_credentials["email"],
+            "password": user_credentials["password"],
+        },
+    )
+    access_token = login_res.json()["data"]["tokens"]["access_token"]
+
+    res = await client.get(
+        "/users/export",
+        params={"format": "csv"},
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert res.status_code == 200
+    users = {row["email"]: row for row in csv.DictReader(io.StringIO(res.text))}
+    assert users[user_credentials["email"]]["role"] == "admin"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_batch(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    product_data = {
+        "description": "This is a test product description with enough length.",
+        "price": 10,
+        "stock": 1,
+    }
+    res = await client.post(
+        "/products/bulk",
+        json={"items": [{"name": f"Product {i}", **product_data} for i in range(2)]},
+        headers=headers,
+    )
+    first, second = [product["id"] for product in res.json()["data"]["created"]]
+
+    missing = str(uuid4())
+    res = await client.get(
+        "/products/batch", params={"ids": [second, missing, first]}, headers=headers
+    )
+    assert res.status_code == 200
+    items = res.json()["data"]
+    assert [(item["id"], item["found"]) for item in items] == [
+        (second, True),
+        (missing, False),
+        (first, True),
+    ]
+    assert items[0]["product"]["id"] == second
+    assert items[1].get("product") is None
+
+    res = await client.get(
+        "/products/batch", params={"ids": [first] * 101}, headers=headers
+    )
+    assert res.status_code == 422
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_get_product_by_id(client: AsyncClient):
     # Setup
@@ -148,6 +808,319 @@ async def test_update_product(client: AsyncClient):
     assert res.status_code == 200
     assert res.json()["data"]["name"] == "Updated Name"
 
+    # partial updates keep unset fields and accept falsy values
+    res = await client.put(f"/products/{product_id}", json={"stock": 0}, headers=headers)
+    assert res.status_code == 200
+    assert (res.json()["data"]["name"], res.json()["data"]["stock"]) == (
+        "Updated Name",
+        0,
+    )
+    assert res.json()["data"]["updated_at"] is not None
+
+    res = await client.put(f"/products/{uuid4()}", json=update_data, headers=headers)
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_product_etags(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    product_data = {
+        "name": "Test Product",
+        "description": "This is a test product description with enough length.",
+        "price": 100.0,
+        "stock": 10,
+    }
+    create_res = await client.post("/products", json=product_data, headers=headers)
+    product_id = create_res.json()["data"]["id"]
+    etag = create_res.headers["etag"]
+
+    res = await client.get(
+        f"/products/{product_id}", headers={**headers, "If-None-Match": etag}
+    )
+    assert res.status_code == 304
+
+    res = await client.get("/products", headers=headers)
+    list_etag = res.headers["etag"]
+    res = await client.get(
+        "/products", headers={**headers, "If-None-Match": list_etag}
+    )
+    assert res.status_code == 304
+
+    # the first writer wins, a stale If-Match is rejected
+    res = await client.put(
+        f"/products/{product_id}",
+        json={"stock": 5},
+        headers={**headers, "If-Match": etag},
+    )
+    assert res.status_code == 200
+    assert res.json()["data"]["version"] == 2
+    assert res.headers["etag"] != etag
+
+    res = await client.put(
+        f"/products/{product_id}",
+        json={"stock": 1},
+        headers={**headers, "If-Match": etag},
+    )
+    assert res.status_code == 412
+
+    res = await client.get(
+        "/products", headers={**headers, "If-None-Match": list_etag}
+    )
+    assert res.status_code == 200
+
+
+class FakeRedis:
+    """Local stand-in for the redis.asyncio commands the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+async def test_product_cache(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch, backend: str
+):
+    if backend == "redis":
+        monkeypatch.setattr(
+            product_cache, "backend", RedisCacheBackend(FakeRedis(), ttl=60)
+        )
+
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    product_data = {
+        "name": "Test Product",
+        "description": "This is a test product description with enough length.",
+        "price": 100.0,
+        "stock": 10,
+    }
+    create_res = await client.post("/products", json=product_data, headers=headers)
+    product_id = create_res.json()["data"]["id"]
+
+    # the second read of the same page and product is served from the cache
+    hits, misses = product_cache.hits, product_cache.misses
+    for _ in range(2):
+        list_res = await client.get("/products", headers=headers)
+        product_res = await client.get(f"/products/{product_id}", headers=headers)
+        assert list_res.status_code == 200
+        assert product_res.status_code == 200
+        assert list_res.json()["data"][0]["id"] == product_id
+        assert product_res.json()["data"]["stock"] == 10
+    assert product_cache.misses - misses == 2
+    assert product_cache.hits - hits == 2
+
+    # a write bumps the user's generation, so the next reads see it
+    res = await client.put(f"/products/{product_id}", json={"stock": 3}, headers=headers)
+    assert res.status_code == 200
+
+    list_res = await client.get("/products", headers=headers)
+    product_res = await client.get(f"/products/{product_id}", headers=headers)
+    assert list_res.json()["data"][0]["stock"] == 3
+    assert product_res.json()["data"]["stock"] == 3
+    assert product_res.headers["etag"] == res.headers["etag"]
+    assert product_cache.misses - misses == 4
+
+    res = await client.delete(
+        "/products", params={"product_ids": [product_id]}, headers=headers
+    )
+    assert res.status_code == 200
+    res = await client.get(f"/products/{product_id}", headers=headers)
+    assert res.status_code == 404
+
+    stats = product_cache.stats()
+    assert stats["hits"] >= 2
+    assert stats["max_entry_bytes"] > 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_create_product_idempotency_key(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    product_data = {
+        "name": "Test Product",
+        "description": "This is a test product description with enough length.",
+        "price": 100.0,
+        "stock": 10,
+    }
+    key_headers = {**headers, "Idempotency-Key": uuid4().hex}
+
+    # a retried create replays the first response instead of duplicating it
+    first = await client.post("/products", json=product_data, headers=key_headers)
+    retry = await client.post("/products", json=product_data, headers=key_headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["data"]["id"] == first.json()["data"]["id"]
+    assert retry.headers["etag"] == first.headers["etag"]
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+
+    res = await client.get("/products", headers=headers)
+    assert len(res.json()["data"]) == 1
+
+    res = await client.post(
+        "/products",
+        json=product_data,
+        headers={**headers, "Idempotency-Key": "x" * 256},
+    )
+    assert res.status_code == 400
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_interrupted_idempotent_request_is_not_rerun():
+    calls = 0
+
+    async def create():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "created", []
+
+    # retries waiting on a cancelled request can't tell if it committed
+    key = ("caller", uuid4().hex)
+    leader = asyncio.create_task(_idempotent_call(key, "fingerprint", create))
+    await asyncio.sleep(0)
+    retries = [
+        asyncio.create_task(_idempotent_call(key, "fingerprint", create))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    results = await asyncio.gather(*retries, return_exceptions=True)
+    assert [error.status_code for error in results] == [409] * 3
+    assert calls == 1
+
+
+def test_redis_product_cache_requires_url():
+    with pytest.raises(ValidationError, match="PRODUCT_CACHE_REDIS_URL"):
+        type(settings)(PRODUCT_CACHE_BACKEND="redis", PRODUCT_CACHE_REDIS_URL=None)
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_memory_cache_generations_are_bounded():
+    backend = MemoryCacheBackend(maxsize=2, ttl=60)
+    generation = await backend.get_generation("user-a")
+
+    # evicted counters restart above every generation handed out so far
+    for user in ["user-b", "user-c"]:
+        await backend.incr_generation(user)
+    assert len(backend.generations) == 2
+    assert await backend.get_generation("user-a") > generation
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_coalesced(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    product_data = {
+        "name": "Test Product",
+        "description": "This is a test product description with enough length.",
+        "price": 100.0,
+        "stock": 10,
+    }
+    await client.post("/products", json=product_data, headers=headers)
+
+    calls = 0
+    get_products = ProductService.get_products
+
+    async def slow_get_products(self, user_id, params):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return await get_products(self, user_id, params)
+
+    monkeypatch.setattr(ProductService, "get_products", slow_get_products)
+
+    # identical concurrent requests share one call and its headers
+    shared = request_flights.shared
+    responses = await asyncio.gather(
+        *(client.get("/products", headers=headers) for _ in range(5))
+    )
+    assert [res.status_code for res in responses] == [200] * 5
+    assert calls == 1
+    assert request_flights.shared - shared == 4
+    assert len({res.headers["etag"] for res in responses}) == 1
+    assert len(request_flights) == 0
+
+    # a capped flight starts a new one once it is full
+    flights = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.05)
+        return "products"
+
+    results = await asyncio.gather(
+        *(flights.do("key", load, max_waiters=2) for _ in range(5))
+    )
+    assert results == ["products"] * 5
+    assert flights.calls == 2
+    assert flights.overflows == 1
+
+    # a cancelled flight is taken over by one waiter, the others share it
+    flights = SingleFlight()
+    calls = 0
+
+    async def slow_load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "products"
+
+    leader = asyncio.create_task(flights.do("key", slow_load))
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(flights.do("key", slow_load)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await asyncio.gather(*waiters) == ["products"] * 5
+    assert calls == 2
+    assert flights.calls == 2
+    assert len(flights) == 0
+
 
 @pytest.mark.asyncio(loop_scope="session")
 async def test_delete_product(client: AsyncClient):
@@ -186,3 +1159,137 @@ async def test_delete_product(client: AsyncClient):
     # Verify deletion
     verify_res = await client.get(f"/products/{product_id}", headers=headers)
     assert verify_res.status_code == 404
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_products_with_claims_only_principal(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "JWT_EMBED_USER_CLAIMS", True)
+
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    claims = jwt.get_unverified_claims(access_token)
+    assert claims["role"] == "user"
+    assert claims["email_verified"] is False
+
+    # products resolve the caller from the token claims alone
+    user_cache.clear()
+    res = await client.get("/products", headers=headers)
+    assert res.status_code == 200
+    assert len(user_cache) == 0
+
+    # admin-only routes are still rejected
+    res = await client.get("/users", headers=headers)
+    assert res.status_code == 403
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_cursor_pagination(client: AsyncClient):
+    # Setup
+    user_credentials = {
+        "name": "Test User",
+        "email": f"test_{uuid4()}@example.com",
+        "password": "Pass!123",
+    }
+    signup_res = await client.post("/auth/signup", json=user_credentials)
+    access_token = signup_res.json()["data"]["tokens"]["access_token"]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    for price in [30, 10, 50, 20, 40]:
+        await client.post(
+            "/products",
+            json={
+                "name": f"Product {price}",
+                "description": "This is a test product description with enough length.",
+                "price": price,
+                "stock": 10,
+            },
+            headers=headers,
+        )
+    # setup and listing share the per-route rate limit
+    limiter.reset()
+
+    async def walk_pages(
+        sort_by: str, sort_order: str, limit: int
+    ) -> tuple[list, list]:
+        # walk every page with the cursor returned by the previous one
+        items, cursors, cursor = [], [], None
+        while True:
+            params = {"sort_by": sort_by, "sort_order": sort_order, "limit": limit}
+            if cursor:
+                params["cursor"] = cursor
+            res = await client.get("/products", params=params, headers=headers)
+            assert res.status_code == 200
+            res_json = res.json()
+            items += res_json["data"]
+            cursor = res_json["meta"]["pagination"].get("next_cursor")
+            if not cursor:
+                return items, cursors
+            cursors.append(cursor)
+
+    items, cursors = await walk_pages("price", "asc", limit=2)
+    assert [item["price"] for item in items] == [10, 20, 30, 40, 50]
+
+    # NULL updated_at values are paged through as well
+    items, _ = await walk_pages("updated_at", "desc", limit=3)
+    assert len({item["id"] for item in items}) == 5
+
+    # cursors are bound to their sort and can't be tampered with
+    for params in [
+        {"sort_by": "price", "sort_order": "asc", "cursor": f"{cursors[0]}x"},
+        {"sort_by": "name", "sort_order": "asc", "cursor": cursors[0]},
+    ]:
+        res = await client.get("/products", params=params, headers=headers)
+        assert res.status_code == 400
+
+
+def _plan_nodes(plan: dict) -> list[str]:
+    return [plan["Node Type"]] + [
+        node for child in plan.get("Plans", []) for node in _plan_nodes(child)
+    ]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("sort_by", ["created_at", "updated_at", "price"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+async def test_keyset_order_uses_index(sort_by: str, sort_order: str):
+    params = ProductParams(sort_by=sort_by, sort_order=sort_order)
+    query = KeysetPaginator(Product, params).apply(
+        select(Product).where(Product.user_id == uuid4())
+    )
+
+    # only nullable columns pin their NULLs, plain ASC/DESC scans either way
+    order_by = str(query.compile()).split("ORDER BY")[1]
+    assert ("NULLS LAST" in order_by) == (sort_by == "updated_at")
+
+    # with seq scans ruled out, an index scan must deliver the order unsorted
+    async with async_session() as session:
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = (await session.execute(Explain(query))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = _plan_nodes(plan[0]["Plan"])
+    assert "Sort" not in nodes and "Incremental Sort" not in nodes, nodes
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("sort_by", ["created_at", "updated_at", "name", "email"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+async def test_user_keyset_order_uses_index(sort_by: str, sort_order: str):
+    params = UserParams(sort_by=sort_by, sort_order=sort_order)
+    query = KeysetPaginator(User, params).apply(select(User))
+
+    async with async_session() as session:
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = (await session.execute(Explain(query))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = _plan_nodes(plan[0]["Plan"])
+    assert "Sort" not in nodes and "Incremental Sort" not in nodes, nodes
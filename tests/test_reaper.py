@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.db.session import async_session
+from app.models.session import Session
+from app.models.user import User
+from app.services.reaper import ReaperService
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reaper_deletes_expired_and_revoked_sessions(client: AsyncClient):
+    email = f"test_{uuid4()}@example.com"
+    await client.post(
+        "/auth/signup",
+        json={"name": "Reaper User", "email": email, "password": "Pass!123"},
+    )
+
+    current_time = datetime.now(timezone.utc)
+    async with async_session() as session:
+        user_id = (
+            await session.execute(select(User.id).where(User.email == email))
+        ).scalar_one()
+        for index, (revoked, expires_at) in enumerate(
+            [
+                (False, current_time - timedelta(minutes=1)),
+                (True, current_time + timedelta(days=1)),
+                (False, current_time - timedelta(days=1)),
+            ]
+        ):
+            session.add(
+                Session(
+                    user_id=user_id,
+                    device_id=f"reaper-{index}",
+                    token_hash=uuid4().hex,
+                    ip_address="127.0.0.1",
+                    user_agent="reaper",
+                    revoked=revoked,
+                    expires_at=expires_at,
+                )
+            )
+        await session.commit()
+
+    # a batch size of 2 forces more than one batch
+    reaper = ReaperService(batch_size=2, batch_pause=0)
+    result = await reaper.run_once()
+    assert result["sessions"] >= 3
+
+    async with async_session() as session:
+        remaining = (
+            await session.execute(
+                select(func.count())
+                .select_from(Session)
+                .where(Session.user_id == user_id)
+            )
+        ).scalar_one()
+    # only the session created at signup is left
+    assert remaining == 1
+    assert reaper.stats()["runs"] == 1